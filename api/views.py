@@ -308,6 +308,23 @@ class BatchOperationView(BaseStoreView):
                         })
                         success_count += 1
                     
+                    elif op_type == 'begin':
+                        transaction_id = store.begin()
+                        results.append({
+                            'type': 'begin',
+                            'transaction_id': transaction_id,
+                            'status': 'success'
+                        })
+                        success_count += 1
+                    
+                    elif op_type in ('commit', 'rollback'):
+                        getattr(store, op_type)()
+                        results.append({
+                            'type': op_type,
+                            'status': 'success'
+                        })
+                        success_count += 1
+                    
                     else:
                         results.append({
                             'type': op_type,
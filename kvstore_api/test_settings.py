@@ -0,0 +1,25 @@
+"""
+Django settings for running the test suite.
+
+Keeps sessions and both databases in memory so the tests need no
+migrations and leave no files behind.
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Sessions in the local-memory cache instead of the session table
+SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# KV store database
+KVSTORE_DATABASE_PATH = ':memory:'
@@ -38,8 +38,22 @@ class AsyncStorageBackend(ABC):
 class AsyncSQLiteStorage(AsyncStorageBackend):
     """Async SQLite-based storage backend."""
     
-    def __init__(self, db_path: str = "kvstore_async.db"):
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+    
+    def __init__(self, db_path: str = "kvstore_async.db", synchronous: str = "FULL"):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            synchronous: SQLite synchronous mode. The default FULL also
+                         survives power loss; NORMAL is faster and, in WAL
+                         mode, still durable across application crashes.
+        """
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        
         self.db_path = db_path
+        self.synchronous = synchronous
         self.connection: Optional[aiosqlite.Connection] = None
         self._lock = asyncio.Lock()
         
@@ -48,19 +62,20 @@ class AsyncSQLiteStorage(AsyncStorageBackend):
         async with self._lock:
             if self.connection is None:
                 self.connection = await aiosqlite.connect(self.db_path)
-                await self.connection.execute("PRAGMA journal_mode=WAL")
-                
-                # Create tables
-                await self.connection.execute("""
+                # Connection tuning and schema in a single round-trip
+                # to the connection's worker thread
+                await self.connection.executescript(f"""
+                    PRAGMA journal_mode=WAL;
+                    PRAGMA synchronous={self.synchronous};
+                    PRAGMA busy_timeout=5000;
+                    
                     CREATE TABLE IF NOT EXISTS kv_data (
                         key TEXT PRIMARY KEY,
                         value TEXT NOT NULL,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                await self.connection.execute("""
+                    );
+                    
                     CREATE TABLE IF NOT EXISTS transaction_log (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         transaction_id TEXT NOT NULL,
@@ -68,10 +83,8 @@ class AsyncSQLiteStorage(AsyncStorageBackend):
                         key TEXT NOT NULL,
                         value TEXT,
                         timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
+                    );
                 """)
-                
-                await self.connection.commit()
     
     async def get_committed_data(self) -> Dict[str, Any]:
         """Get all committed key-value pairs from database."""
@@ -100,16 +113,16 @@ class AsyncSQLiteStorage(AsyncStorageBackend):
         async with self._lock:
             try:
                 # Apply changes
-                for key, value in changes.items():
-                    value_json = json.dumps(value)
-                    await self.connection.execute("""
-                        INSERT OR REPLACE INTO kv_data (key, value, updated_at)
-                        VALUES (?, ?, CURRENT_TIMESTAMP)
-                    """, (key, value_json))
+                await self.connection.executemany("""
+                    INSERT OR REPLACE INTO kv_data (key, value, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                """, [(key, json.dumps(value)) for key, value in changes.items()])
                 
                 # Apply deletions
-                for key in deletions:
-                    await self.connection.execute("DELETE FROM kv_data WHERE key = ?", (key,))
+                await self.connection.executemany(
+                    "DELETE FROM kv_data WHERE key = ?",
+                    [(key,) for key in deletions]
+                )
                 
                 await self.connection.commit()
                 
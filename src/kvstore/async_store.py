@@ -2,7 +2,7 @@
 Async Store class implementation for the transactional key-value store.
 """
 
-from typing import Any, Optional, TYPE_CHECKING
+from typing import Any, Iterable, Mapping, Optional, TYPE_CHECKING
 from .async_transaction import AsyncTransactionManager
 from .exceptions import (
     KeyNotFoundError,
@@ -110,6 +110,58 @@ class AsyncStore:
         except KeyError:
             raise KeyNotFoundError(f"Key '{key}' not found")
     
+    async def set_many(self, items: Mapping[str, Any]) -> None:
+        """
+        Set several key-value pairs in the current transaction.
+        
+        Equivalent to calling set() for each pair, but acquires the
+        transaction lock only once.
+        
+        Args:
+            items: Mapping of keys to the values to associate with them
+            
+        Raises:
+            NoActiveTransactionError: If no transaction is active
+        """
+        if not self._initialized:
+            await self.initialize()
+            
+        if not self._transaction_manager.has_active_transaction():
+            raise NoActiveTransactionError("No active transaction. Call begin() first.")
+        
+        try:
+            await self._transaction_manager.set_many(items)
+        except ValueError as e:
+            raise TransactionError(str(e))
+    
+    async def get_many(self, keys: Iterable[str]) -> list[Any]:
+        """
+        Get the values for several keys.
+        
+        Equivalent to calling get() for each key, but acquires the
+        transaction lock only once.
+        
+        Args:
+            keys: The keys to retrieve
+            
+        Returns:
+            The values associated with the keys, in the same order
+            
+        Raises:
+            KeyNotFoundError: If any of the keys is not found
+            NoActiveTransactionError: If no transaction is active
+        """
+        if not self._initialized:
+            await self.initialize()
+            
+        if not self._transaction_manager.has_active_transaction():
+            raise NoActiveTransactionError("No active transaction. Call begin() first.")
+        
+        try:
+            return await self._transaction_manager.get_many(keys)
+        except KeyError as e:
+            raise KeyNotFoundError(e.args[0])
+    
     async def delete(self, key: str) -> None:
         """
         Delete a key from the store.
@@ -221,6 +273,17 @@ class AsyncStore:
         committed_data = await self._transaction_manager.get_committed_data()
         return committed_data.copy()
     
+    async def _clear(self) -> None:
+        """
+        Discard all transactions and committed data (for testing purposes).
+        
+        Lets a single store instance be reused across tests.
+        """
+        if not self._initialized:
+            await self.initialize()
+            
+        await self._transaction_manager.clear()
+    
     async def close(self) -> None:
         """
         Close the store and its storage backend.
@@ -4,8 +4,7 @@ Async transaction management for the key-value store.
 
 import asyncio
 from enum import Enum
-from typing import Dict, Any, Optional, List, TYPE_CHECKING
-import uuid
+from typing import Dict, Any, Iterable, Mapping, Optional, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .async_storage import AsyncStorageBackend
@@ -99,24 +98,33 @@ class AsyncTransactionManager:
     async def get(self, key: str) -> Any:
         """Get a value, considering transaction stack."""
         async with self._lock:
-            # Check transactions from most recent to oldest
-            for transaction in reversed(self.transaction_stack):
-                if transaction.is_deleted(key):
-                    raise KeyError(f"Key '{key}' not found")
-                if transaction.has_key(key):
-                    return transaction.get_value(key)
-            
-            # Check committed data
-            if self._committed_data is None:
-                if self.storage_backend:
-                    self._committed_data = await self.storage_backend.get_committed_data()
-                else:
-                    self._committed_data = {}
-            
-            if key in self._committed_data:
-                return self._committed_data[key]
-            
-            raise KeyError(f"Key '{key}' not found")
+            return await self._get_unlocked(key)
+    
+    async def get_many(self, keys: Iterable[str]) -> List[Any]:
+        """Get several values under a single lock acquisition."""
+        async with self._lock:
+            return [await self._get_unlocked(key) for key in keys]
+    
+    async def _get_unlocked(self, key: str) -> Any:
+        """Get a value, considering transaction stack. Caller holds the lock."""
+        # Check transactions from most recent to oldest
+        for transaction in reversed(self.transaction_stack):
+            if transaction.is_deleted(key):
+                raise KeyError(f"Key '{key}' not found")
+            if transaction.has_key(key):
+                return transaction.get_value(key)
+        
+        # Check committed data
+        if self._committed_data is None:
+            if self.storage_backend:
+                self._committed_data = await self.storage_backend.get_committed_data()
+            else:
+                self._committed_data = {}
+        
+        if key in self._committed_data:
+            return self._committed_data[key]
+        
+        raise KeyError(f"Key '{key}' not found")
     
     async def set(self, key: str, value: Any) -> None:
         """Set a value in the current transaction."""
@@ -127,6 +135,16 @@ class AsyncTransactionManager:
             current_transaction = self.transaction_stack[-1]
             current_transaction.set(key, value)
     
+    async def set_many(self, items: Mapping[str, Any]) -> None:
+        """Set several values in the current transaction under a single lock acquisition."""
+        async with self._lock:
+            if not self.transaction_stack:
+                raise ValueError("No active transaction")
+            
+            current_transaction = self.transaction_stack[-1]
+            for key, value in items.items():
+                current_transaction.set(key, value)
+    
     async def delete(self, key: str) -> None:
         """Delete a key in the current transaction."""
         async with self._lock:
@@ -161,6 +179,18 @@ class AsyncTransactionManager:
             current_transaction = self.transaction_stack[-1]
             current_transaction.delete(key)
     
+    async def clear(self) -> None:
+        """Discard the transaction stack and all committed data."""
+        async with self._lock:
+            for transaction in self.transaction_stack:
+                transaction.state = TransactionState.ROLLED_BACK
+            self.transaction_stack.clear()
+            
+            if self.storage_backend:
+                committed_data = await self.storage_backend.get_committed_data()
+                await self.storage_backend.commit_transaction({}, set(committed_data))
+            self._committed_data = {}
+    
     def has_active_transaction(self) -> bool:
         """Check if there's an active transaction."""
         return len(self.transaction_stack) > 0
@@ -8,6 +8,7 @@ import os
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, List, Tuple
 from contextlib import contextmanager
+from pathlib import Path
 
 
 class StorageBackend(ABC):
@@ -37,14 +38,30 @@ class StorageBackend(ABC):
 class SQLiteStorage(StorageBackend):
     """SQLite-based storage backend."""
     
-    def __init__(self, db_path: str = "kvstore.db"):
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+    
+    def __init__(self, db_path: str = "kvstore.db", synchronous: str = "FULL"):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            synchronous: SQLite synchronous mode. The default FULL also
+                         survives power loss; NORMAL is faster and, in WAL
+                         mode, still durable across application crashes.
+        """
+        synchronous = synchronous.upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        
         self.db_path = db_path
+        self.synchronous = synchronous
         self.connection: Optional[sqlite3.Connection] = None
         
     def initialize(self) -> None:
         """Initialize SQLite database with required tables."""
         self.connection = sqlite3.connect(self.db_path)
         self.connection.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode
+        self.connection.execute(f"PRAGMA synchronous={self.synchronous}")
+        self.connection.execute("PRAGMA busy_timeout=5000")
         
         # Create tables
         self.connection.execute("""
@@ -96,16 +113,16 @@ class SQLiteStorage(StorageBackend):
         
         try:
             # Apply changes
-            for key, value in changes.items():
-                value_json = json.dumps(value)
-                cursor.execute("""
-                    INSERT OR REPLACE INTO kv_data (key, value, updated_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                """, (key, value_json))
+            cursor.executemany("""
+                INSERT OR REPLACE INTO kv_data (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, [(key, json.dumps(value)) for key, value in changes.items()])
             
             # Apply deletions
-            for key in deletions:
-                cursor.execute("DELETE FROM kv_data WHERE key = ?", (key,))
+            cursor.executemany(
+                "DELETE FROM kv_data WHERE key = ?",
+                [(key,) for key in deletions]
+            )
             
             self.connection.commit()
             
@@ -187,8 +204,7 @@ class SQLiteStorage(StorageBackend):
             self.connection.close()
         
         # Replace current database with backup
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        Path(self.db_path).unlink(missing_ok=True)
         
         backup_conn = sqlite3.connect(backup_path)
         new_conn = sqlite3.connect(self.db_path)
@@ -2,8 +2,8 @@
 Main Store class implementation for the transactional key-value store.
 """
 
-from typing import Any, Optional, TYPE_CHECKING
-from .transaction import TransactionManager
+from typing import Any, Iterable, Mapping, Optional, TYPE_CHECKING
+from .transaction import _MISSING, TransactionManager
 from .exceptions import (
     KeyNotFoundError,
     NoActiveTransactionError,
@@ -42,6 +42,8 @@ class Store:
         # Inner transaction sees a=60, outer sees a=50 after rollback
     """
     
+    __slots__ = ("_transaction_manager", "_storage_backend")
+    
     def __init__(self, storage_backend: Optional['StorageBackend'] = None) -> None:
         """
         Initialize the store.
@@ -57,6 +59,9 @@ class Store:
         """
         Set a key-value pair in the current transaction.
         
+        The value is stored by reference, not copied. Do not mutate a
+        mutable value after setting it; set a new object instead.
+        
         Args:
             key: The key to set
             value: The value to associate with the key
@@ -89,10 +94,44 @@ class Store:
         if not self._transaction_manager.has_active_transaction():
             raise NoActiveTransactionError("No active transaction. Call begin() first.")
         
-        try:
-            return self._transaction_manager.get(key)
-        except KeyError:
+        value = self._transaction_manager.lookup(key)
+        if value is _MISSING:
             raise KeyNotFoundError(f"Key '{key}' not found")
+        return value
+    
+    def contains_many(self, keys: Iterable[str]) -> list[bool]:
+        """
+        Check whether each of several keys is visible in the current transaction.
+        
+        Args:
+            keys: The keys to look up
+            
+        Returns:
+            A list of booleans, one per key, in the same order as keys
+            
+        Raises:
+            NoActiveTransactionError: If no transaction is active
+        """
+        if not self._transaction_manager.has_active_transaction():
+            raise NoActiveTransactionError("No active transaction. Call begin() first.")
+        
+        contains = self._transaction_manager.contains
+        return [contains(key) for key in keys]
+    
+    def snapshot(self) -> Mapping[str, Any]:
+        """
+        Get all key-value pairs visible in the current transaction.
+        
+        Equivalent to calling get() for every visible key, but resolves
+        the transaction stack in a single pass. Without an active
+        transaction, this is the committed data, returned in O(1) by
+        sharing it until the next commit copies it on write.
+        
+        Returns:
+            A read-only mapping of each visible key to its value, which
+            does not change when the store is later modified
+        """
+        return self._transaction_manager.snapshot()
     
     def delete(self, key: str) -> None:
         """
@@ -160,6 +199,80 @@ class Store:
         except ValueError as e:
             raise TransactionError(str(e))
     
+    def commit_all(self) -> None:
+        """
+        Commit all active transactions, from the innermost outwards.
+        
+        Equivalent to calling commit() until no transaction is active,
+        but the nested changes are merged in a single pass and persisted
+        with one top-level commit.
+        
+        Raises:
+            NoActiveTransactionError: If no transaction is active
+        """
+        if not self._transaction_manager.has_active_transaction():
+            raise NoActiveTransactionError("No active transaction to commit")
+        
+        try:
+            self._transaction_manager.commit_all()
+        except ValueError as e:
+            raise TransactionError(str(e))
+    
+    def rollback_all(self) -> None:
+        """
+        Rollback all active transactions.
+        
+        All changes made in any active transaction are discarded.
+        
+        Raises:
+            NoActiveTransactionError: If no transaction is active
+        """
+        if not self._transaction_manager.has_active_transaction():
+            raise NoActiveTransactionError("No active transaction to rollback")
+        
+        try:
+            self._transaction_manager.rollback_all()
+        except ValueError as e:
+            raise TransactionError(str(e))
+    
+    def exec_ops(self, ops: Iterable[tuple]) -> list[Any]:
+        """
+        Run a sequence of store operations in order.
+        
+        Each operation is a tuple of a method name followed by its
+        arguments, e.g. ("begin",), ("set", "a", 50), ("get", "a").
+        Execution stops at the first operation that raises.
+        
+        Args:
+            ops: The operations to run
+        
+        Returns:
+            A list with the return value of each operation, in order
+        
+        Raises:
+            ValueError: If an operation name is not supported
+            StoreError: Whatever the failing operation raises
+        """
+        table = {
+            "begin": self.begin,
+            "set": self.set,
+            "get": self.get,
+            "delete": self.delete,
+            "commit": self.commit,
+            "rollback": self.rollback,
+            "commit_all": self.commit_all,
+            "rollback_all": self.rollback_all,
+        }
+        results = []
+        append = results.append
+        for op in ops:
+            try:
+                method = table[op[0]]
+            except KeyError:
+                raise ValueError(f"Unsupported operation: {op[0]!r}")
+            append(method(*op[1:]))
+        return results
+    
     # Additional utility methods
     
     def has_active_transaction(self) -> bool:
@@ -180,14 +293,23 @@ class Store:
         """
         return self._transaction_manager.get_current_transaction_id()
     
-    def _get_committed_data(self) -> dict[str, Any]:
+    def _get_committed_data(self) -> Mapping[str, Any]:
         """
         Get the committed data (for testing purposes).
         
         Returns:
-            A copy of the committed data
+            A read-only snapshot of the committed data, which does not
+            change when the store is later modified
         """
-        return self._transaction_manager.committed_data.copy()
+        return self._transaction_manager.committed_snapshot()
+    
+    def _clear(self) -> None:
+        """
+        Discard all transactions and committed data (for testing purposes).
+        
+        Lets a single store instance be reused across tests.
+        """
+        self._transaction_manager.clear()
     
     def close(self) -> None:
         """
@@ -198,6 +320,42 @@ class Store:
         """
         self._transaction_manager.close()
     
+    def committed_contains(self, key: str) -> bool:
+        """
+        Check whether a key is committed, ignoring any active transaction.
+        
+        Unlike contains_many(), this does not see uncommitted changes and
+        does not require an active transaction.
+        
+        Args:
+            key: The key to look up
+            
+        Returns:
+            True if the key is in the committed data, False otherwise
+        """
+        return key in self._transaction_manager.committed_data
+    
+    def committed_get(self, key: str) -> Any:
+        """
+        Get the committed value for a key, ignoring any active transaction.
+        
+        Unlike get(), this does not see uncommitted changes and does not
+        require an active transaction.
+        
+        Args:
+            key: The key to retrieve
+            
+        Returns:
+            The committed value associated with the key
+            
+        Raises:
+            KeyNotFoundError: If the key is not committed
+        """
+        try:
+            return self._transaction_manager.committed_data[key]
+        except KeyError:
+            raise KeyNotFoundError(f"Key '{key}' not found")
+    
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -2,15 +2,39 @@
 Transaction management for the key-value store.
 """
 
-from enum import Enum
-from typing import Dict, Any, Optional, List, TYPE_CHECKING
+import itertools
+import os
 import uuid
-import copy
+from enum import Enum
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .storage import StorageBackend
 
 
+# Returned by TransactionManager.lookup() for keys that are not visible
+_MISSING = object()
+
+# Transaction IDs are returned by the API and written to the SQLite
+# transaction log, so they must not repeat across restarts or between
+# worker processes. Each process numbers its transactions behind a random
+# prefix, drawn again in forked children.
+_transaction_id_prefix = uuid.uuid4().hex[:12]
+_transaction_ids = itertools.count(1)
+
+
+def _reset_transaction_ids() -> None:
+    """Start a new transaction ID sequence for a forked process."""
+    global _transaction_id_prefix, _transaction_ids
+    _transaction_id_prefix = uuid.uuid4().hex[:12]
+    _transaction_ids = itertools.count(1)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_transaction_ids)
+
+
 class TransactionState(Enum):
     """Transaction state enumeration."""
     ACTIVE = "active"
@@ -21,8 +45,10 @@ class TransactionState(Enum):
 class Transaction:
     """Represents a single transaction with its state and operations."""
     
+    __slots__ = ("id", "state", "parent", "changes", "deleted_keys")
+    
     def __init__(self, parent: Optional['Transaction'] = None) -> None:
-        self.id = str(uuid.uuid4())
+        self.id = f"{_transaction_id_prefix}-{next(_transaction_ids)}"
         self.state = TransactionState.ACTIVE
         self.parent = parent
         self.changes: Dict[str, Any] = {}  # Key -> Value mapping for this transaction
@@ -64,10 +90,15 @@ class Transaction:
 class TransactionManager:
     """Manages the transaction stack and provides transaction operations."""
     
+    __slots__ = ("transaction_stack", "storage_backend", "_committed_data", "_committed_shared")
+    
     def __init__(self, storage_backend: Optional['StorageBackend'] = None) -> None:
         self.transaction_stack: List[Transaction] = []
         self.storage_backend = storage_backend
         self._committed_data: Optional[Dict[str, Any]] = None
+        # Set while a snapshot() view shares _committed_data; the next
+        # in-place change copies the dict first.
+        self._committed_shared = False
         
         # Load committed data from storage if available
         if self.storage_backend:
@@ -102,33 +133,67 @@ class TransactionManager:
         current_transaction.state = TransactionState.COMMITTED
         
         if self.transaction_stack:
-            # Nested transaction: merge changes into parent
+            # Nested transaction: merge changes into parent. Each layer only
+            # holds its own delta, so this is proportional to the child's
+            # changes rather than to the size of the parent.
             parent_transaction = self.transaction_stack[-1]
+            changes = current_transaction.changes
+            deleted_keys = current_transaction.deleted_keys
             
             # Apply changes to parent
-            for key, value in current_transaction.changes.items():
-                parent_transaction.set(key, value)
+            parent_transaction.changes.update(changes)
+            parent_transaction.deleted_keys.difference_update(changes)
             
             # Apply deletions to parent
-            for key in current_transaction.deleted_keys:
-                parent_transaction.delete(key)
+            for key in deleted_keys:
+                parent_transaction.changes.pop(key, None)
+            parent_transaction.deleted_keys |= deleted_keys
         else:
             # Top-level transaction: commit to store
-            if self.storage_backend:
-                # Commit to persistent storage
-                self.storage_backend.commit_transaction(
-                    current_transaction.changes,
-                    current_transaction.deleted_keys
-                )
-                # Reload committed data from storage
-                self._committed_data = self.storage_backend.get_committed_data()
-            else:
-                # Commit to in-memory storage
-                for key, value in current_transaction.changes.items():
-                    self.committed_data[key] = value
-                
-                for key in current_transaction.deleted_keys:
-                    self.committed_data.pop(key, None)
+            self._commit_to_store(
+                current_transaction.changes,
+                current_transaction.deleted_keys
+            )
+    
+    def commit_all(self) -> None:
+        """Commit every transaction on the stack in a single pass."""
+        if not self.transaction_stack:
+            raise ValueError("No active transaction to commit")
+        
+        # Fold the stack from the outermost transaction inwards so that
+        # inner changes win, exactly as with repeated commit() calls.
+        changes: Dict[str, Any] = {}
+        deleted_keys: set[str] = set()
+        for transaction in self.transaction_stack:
+            for key, value in transaction.changes.items():
+                changes[key] = value
+                deleted_keys.discard(key)
+            for key in transaction.deleted_keys:
+                deleted_keys.add(key)
+                changes.pop(key, None)
+            transaction.state = TransactionState.COMMITTED
+        
+        self.transaction_stack.clear()
+        self._commit_to_store(changes, deleted_keys)
+    
+    def _commit_to_store(self, changes: Dict[str, Any], deleted_keys: set[str]) -> None:
+        """Apply top-level transaction changes to the committed data."""
+        if self.storage_backend:
+            # Commit to persistent storage
+            self.storage_backend.commit_transaction(changes, deleted_keys)
+            # Reload committed data from storage
+            self._committed_data = self.storage_backend.get_committed_data()
+        else:
+            # Commit to in-memory storage
+            if self._committed_shared:
+                self._committed_data = dict(self.committed_data)
+                self._committed_shared = False
+            
+            for key, value in changes.items():
+                self.committed_data[key] = value
+            
+            for key in deleted_keys:
+                self.committed_data.pop(key, None)
     
     def rollback(self) -> None:
         """Rollback the current transaction."""
@@ -139,20 +204,75 @@ class TransactionManager:
         current_transaction.state = TransactionState.ROLLED_BACK
         # Changes are simply discarded
     
-    def get(self, key: str) -> Any:
-        """Get a value, considering transaction stack."""
+    def rollback_all(self) -> None:
+        """Rollback every transaction on the stack."""
+        if not self.transaction_stack:
+            raise ValueError("No active transaction to rollback")
+        
+        for transaction in self.transaction_stack:
+            transaction.state = TransactionState.ROLLED_BACK
+        self.transaction_stack.clear()
+    
+    def lookup(self, key: str, default: Any = _MISSING) -> Any:
+        """Get a value, considering transaction stack, or default if not found."""
         # Check transactions from most recent to oldest
+        for transaction in reversed(self.transaction_stack):
+            if key in transaction.deleted_keys:
+                return default
+            changes = transaction.changes
+            if key in changes:
+                return changes[key]
+        
+        # Check committed data
+        return self.committed_data.get(key, default)
+    
+    def clear(self) -> None:
+        """Discard the transaction stack and all committed data."""
+        for transaction in self.transaction_stack:
+            transaction.state = TransactionState.ROLLED_BACK
+        self.transaction_stack.clear()
+        
+        if self.storage_backend:
+            self._commit_to_store({}, set(self.committed_data))
+        else:
+            # Start from a new dict rather than emptying one that earlier
+            # snapshots may still share
+            self._committed_data = {}
+        self._committed_shared = False
+    
+    def contains(self, key: str) -> bool:
+        """Check if a key is visible, considering transaction stack."""
         for transaction in reversed(self.transaction_stack):
             if transaction.is_deleted(key):
-                raise KeyError(f"Key '{key}' not found")
+                return False
             if transaction.has_key(key):
-                return transaction.get_value(key)
+                return True
         
-        # Check committed data
-        if key in self.committed_data:
-            return self.committed_data[key]
+        return key in self.committed_data
+    
+    def committed_snapshot(self) -> Mapping[str, Any]:
+        """Get a read-only view of the committed data as it is now."""
+        # Share the committed dict instead of copying it; the next
+        # in-memory commit copies it before writing, and storage-backed
+        # commits replace it with a freshly loaded dict.
+        committed_data = self.committed_data
+        self._committed_shared = True
+        return MappingProxyType(committed_data)
+    
+    def snapshot(self) -> Mapping[str, Any]:
+        """Get a read-only view of every visible key-value pair."""
+        if not self.transaction_stack:
+            return self.committed_snapshot()
+        
+        data = dict(self.committed_data)
+        
+        # Apply transactions from oldest to most recent
+        for transaction in self.transaction_stack:
+            for key in transaction.deleted_keys:
+                data.pop(key, None)
+            data.update(transaction.changes)
         
-        raise KeyError(f"Key '{key}' not found")
+        return MappingProxyType(data)
     
     def set(self, key: str, value: Any) -> None:
         """Set a value in the current transaction."""
@@ -168,9 +288,7 @@ class TransactionManager:
             raise ValueError("No active transaction")
         
         # Check if key exists (in any transaction or committed data)
-        try:
-            self.get(key)  # This will raise KeyError if not found
-        except KeyError:
+        if not self.contains(key):
             raise KeyError(f"Key '{key}' not found")
         
         current_transaction = self.transaction_stack[-1]
@@ -3,16 +3,12 @@ Comprehensive API tests for the Store class - Phase 3 implementation.
 """
 
 import pytest
-import sys
-import os
-import tempfile
+import sqlite3
 import threading
 import time
+import tracemalloc
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from kvstore import Store, SQLiteStorage, InMemoryStorage
 from kvstore.exceptions import (
     KeyNotFoundError,
@@ -20,44 +16,34 @@ from kvstore.exceptions import (
     TransactionError,
 )
 
+_SQLITE_THREADSAFE = sqlite3.threadsafety >= 1
+
+NESTED_KEYS = [f"key_{i}" for i in range(10)]
+NESTED_VALUES = [f"value_{i}" for i in range(10)]
+
+
+def make_backend(kind, tmp_path):
+    """Build the storage backend for a TestStoreInitialization case."""
+    if kind == "none":
+        return None
+    if kind == "inmemory":
+        return InMemoryStorage()
+    return SQLiteStorage(str(tmp_path / "init.db"))
+
 
 class TestStoreInitialization:
     """Test Store initialization with various parameters."""
     
-    def test_store_default_initialization(self):
-        """Test Store with default (no storage backend)."""
-        store = Store()
+    @pytest.mark.parametrize(
+        "kind", ["none", "inmemory", pytest.param("sqlite", marks=pytest.mark.sqlite)]
+    )
+    def test_store_initialization(self, kind, tmp_path):
+        """Test Store initialization with each storage backend."""
+        store = Store(make_backend(kind, tmp_path))
         assert store is not None
         assert not store.has_active_transaction()
         assert store.get_current_transaction_id() is None
-    
-    def test_store_with_inmemory_storage(self):
-        """Test Store with InMemoryStorage."""
-        storage = InMemoryStorage()
-        store = Store(storage)
-        assert store is not None
-        assert not store.has_active_transaction()
-    
-    def test_store_with_sqlite_storage(self):
-        """Test Store with SQLiteStorage."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        
-        try:
-            storage = SQLiteStorage(temp_db.name)
-            store = Store(storage)
-            assert store is not None
-            assert not store.has_active_transaction()
-            store.close()
-        finally:
-            if os.path.exists(temp_db.name):
-                os.unlink(temp_db.name)
-    
-    def test_store_initialization_with_none(self):
-        """Test Store initialization with None storage backend."""
-        store = Store(None)
-        assert store is not None
-        assert not store.has_active_transaction()
+        store.close()
 
 
 class TestStoreAPIValidation:
@@ -190,30 +176,24 @@ class TestStoreTransactionEdgeCases:
         transaction_ids = []
         
         # Create 10 nested transactions
-        for i in range(10):
+        for key, value in zip(NESTED_KEYS, NESTED_VALUES):
             tx_id = self.store.begin()
             transaction_ids.append(tx_id)
-            self.store.set(f"key_{i}", f"value_{i}")
+            self.store.set(key, value)
         
         # Verify all values are visible
-        for i in range(10):
-            assert self.store.get(f"key_{i}") == f"value_{i}"
+        assert [self.store.get(key) for key in NESTED_KEYS] == NESTED_VALUES
         
         # Rollback half of them
         for i in range(5):
             self.store.rollback()
         
         # Verify remaining values
-        for i in range(5):
-            assert self.store.get(f"key_{i}") == f"value_{i}"
-        
-        for i in range(5, 10):
-            with pytest.raises(KeyNotFoundError):
-                self.store.get(f"key_{i}")
+        assert [self.store.get(key) for key in NESTED_KEYS[:5]] == NESTED_VALUES[:5]
+        assert self.store.contains_many(NESTED_KEYS[5:]) == [False] * 5
         
         # Commit the rest
-        for i in range(5):
-            self.store.commit()
+        self.store.commit_all()
         
         assert not self.store.has_active_transaction()
 
@@ -363,8 +343,7 @@ class TestStorePerformance:
         
         # Commit all transactions
         start_time = time.time()
-        for i in range(100):
-            self.store.commit()
+        self.store.commit_all()
         
         commit_time = time.time() - start_time
         
@@ -374,25 +353,32 @@ class TestStorePerformance:
     
     def test_memory_usage_stability(self):
         """Test that memory usage remains stable."""
-        # This is a basic test - in production you'd use memory profiling tools
-        
-        # Perform many operations
-        for cycle in range(10):
-            self.store.begin()
-            
-            # Add data
-            for i in range(100):
-                self.store.set(f"cycle_{cycle}_key_{i}", f"value_{i}")
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
             
-            # Read data
-            for i in range(100):
-                self.store.get(f"cycle_{cycle}_key_{i}")
+            # Perform many operations
+            for cycle in range(2):
+                keys = [f"cycle_{cycle}_key_{i}" for i in range(50)]
+                self.store.begin()
+                
+                # Add data
+                for i, key in enumerate(keys):
+                    self.store.set(key, f"value_{i}")
+                
+                # Read data
+                for key in keys:
+                    self.store.get(key)
+                
+                # Clean up
+                self.store.rollback()
             
-            # Clean up
-            self.store.rollback()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
         
-        # If we get here without memory issues, test passes
-        assert True
+        growth = peak - baseline
+        assert growth < 5 * 1024 * 1024, f"Peak memory grew by {growth} bytes"
 
 
 class TestStoreRequirementsCompliance:
@@ -423,8 +409,7 @@ class TestStoreRequirementsCompliance:
         self.store.commit()  # Outer commit
         
         # Verify final state
-        committed_data = self.store._get_committed_data()
-        assert committed_data["a"] == 50
+        assert self.store.committed_get("a") == 50
     
     def test_all_required_methods_exist(self):
         """Test that all required methods exist and are callable."""
@@ -530,60 +515,47 @@ class TestStoreErrorRecovery:
         assert not self.store.has_active_transaction()
 
 
+@pytest.mark.sqlite
+@pytest.mark.skipif(not _SQLITE_THREADSAFE, reason="sqlite3 not threadsafe")
 class TestStoreWithPersistenceIntegration:
     """Test Store API with persistence backends."""
     
-    def test_api_consistency_across_backends(self):
-        """Test that API behaves consistently across storage backends."""
-        # Test data
-        test_operations = [
-            ("begin", []),
-            ("set", ["consistency_key", "consistency_value"]),
-            ("set", ["number_key", 42]),
-            ("commit", []),
-            ("begin", []),
-            ("get", ["consistency_key"]),
-            ("get", ["number_key"]),
-            ("delete", ["number_key"]),
-            ("commit", []),
-        ]
-        
-        # Test with in-memory storage
-        memory_store = Store(InMemoryStorage())
-        memory_results = []
-        
-        for operation, args in test_operations:
-            if operation in ["get"]:
-                result = getattr(memory_store, operation)(*args)
-                memory_results.append(result)
+    CONSISTENCY_OPERATIONS = [
+        ("begin", []),
+        ("set", ["consistency_key", "consistency_value"]),
+        ("set", ["number_key", 42]),
+        ("commit", []),
+        ("begin", []),
+        ("get", ["consistency_key"]),
+        ("get", ["number_key"]),
+        ("delete", ["number_key"]),
+        ("commit", []),
+    ]
+    EXPECTED_RESULTS = ["consistency_value", 42]
+    
+    def _execute(self, store):
+        """Run the consistency operations against a store and collect get() results."""
+        ops = {
+            name: getattr(store, name)
+            for name in ("begin", "set", "get", "delete", "commit")
+        }
+        results = []
+        for operation, args in self.CONSISTENCY_OPERATIONS:
+            if operation == "get":
+                results.append(ops["get"](*args))
             else:
-                getattr(memory_store, operation)(*args)
-        
-        memory_store.close()
-        
-        # Test with SQLite storage
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
+                ops[operation](*args)
+        return results
+    
+    def test_api_consistency_across_backends(self, tmp_path):
+        """Test that API behaves consistently across storage backends."""
+        # Each backend is checked against the same ground truth, so the
+        # results are consistent without a separate cross-backend comparison.
+        with Store(InMemoryStorage()) as memory_store:
+            assert self._execute(memory_store) == self.EXPECTED_RESULTS
         
-        try:
-            sqlite_store = Store(SQLiteStorage(temp_db.name))
-            sqlite_results = []
-            
-            for operation, args in test_operations:
-                if operation in ["get"]:
-                    result = getattr(sqlite_store, operation)(*args)
-                    sqlite_results.append(result)
-                else:
-                    getattr(sqlite_store, operation)(*args)
-            
-            sqlite_store.close()
-            
-            # Results should be identical
-            assert memory_results == sqlite_results
-            
-        finally:
-            if os.path.exists(temp_db.name):
-                os.unlink(temp_db.name)
+        with Store(SQLiteStorage(str(tmp_path / "consistency.db"))) as sqlite_store:
+            assert self._execute(sqlite_store) == self.EXPECTED_RESULTS
 
 
 if __name__ == "__main__":
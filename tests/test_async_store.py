@@ -3,15 +3,12 @@ Tests for async Store implementation.
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
-import sys
+import importlib.util
 import os
-import tempfile
 from concurrent.futures import ThreadPoolExecutor
-import time
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from contextlib import asynccontextmanager
 
 from kvstore import AsyncStore, AsyncSQLiteStorage, AsyncInMemoryStorage
 from kvstore.exceptions import (
@@ -21,64 +18,97 @@ from kvstore.exceptions import (
 )
 
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def shared_store():
+    """Initialized in-memory AsyncStore shared by the tests of this module."""
+    store = AsyncStore(AsyncInMemoryStorage())
+    await store.initialize()
+    yield store
+    await store.close()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def store(shared_store):
+    """The shared store, cleared of transactions and data after each test."""
+    yield shared_store
+    await shared_store._clear()
+
+
+@asynccontextmanager
+async def _txn_store(store):
+    """Run the block inside a transaction that is rolled back on exit."""
+    await store.begin()
+    try:
+        yield store
+    finally:
+        await store.rollback()
+
+
+async def _batch_operations(store, batch_id: int, operations_per_batch: int = 100):
+    """Run one committed batch of set/get operations on the store."""
+    keys = [f"batch_{batch_id}_key_{i}" for i in range(operations_per_batch)]
+    vals = [f"value_{i}" for i in range(operations_per_batch)]
+
+    await store.begin()
+
+    # Set operations
+    await store.set_many(dict(zip(keys, vals)))
+
+    # Get operations
+    assert await store.get_many(keys) == vals
+
+    await store.commit()
+    return batch_id
+
+
 class TestAsyncStoreBasicOperations:
     """Test basic async store operations."""
     
-    @pytest.mark.asyncio
-    async def test_async_store_initialization(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_store_initialization(self, store):
         """Test async store can be initialized."""
-        store = AsyncStore()
-        await store.initialize()
-        
         assert store is not None
         assert not store.has_active_transaction()
         assert store.get_current_transaction_id() is None
-        
-        await store.close()
     
-    @pytest.mark.asyncio
-    async def test_async_set_without_transaction_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_set_without_transaction_raises_error(self, store):
         """Test that async set() raises error without active transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         with pytest.raises(NoActiveTransactionError):
             await store.set("key", "value")
-        
-        await store.close()
     
-    @pytest.mark.asyncio
-    async def test_async_get_without_transaction_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_get_without_transaction_raises_error(self, store):
         """Test that async get() raises error without active transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         with pytest.raises(NoActiveTransactionError):
             await store.get("key")
-        
-        await store.close()
     
-    @pytest.mark.asyncio
-    async def test_async_delete_without_transaction_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_delete_without_transaction_raises_error(self, store):
         """Test that async delete() raises error without active transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         with pytest.raises(NoActiveTransactionError):
             await store.delete("key")
+    
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_clear_discards_transactions_and_data(self, store):
+        """Test that _clear() resets the store for reuse."""
+        await store.begin()
+        await store.set("key", "value")
+        await store.commit()
+        await store.begin()
         
-        await store.close()
+        await store._clear()
+        
+        assert not store.has_active_transaction()
+        assert await store._get_committed_data() == {}
 
 
 class TestAsyncStoreTransactionLifecycle:
     """Test async transaction lifecycle operations."""
     
-    @pytest.mark.asyncio
-    async def test_async_begin_transaction(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_begin_transaction(self, store):
         """Test beginning an async transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         tx_id = await store.begin()
         
         assert tx_id is not None
@@ -87,82 +117,63 @@ class TestAsyncStoreTransactionLifecycle:
         assert store.get_current_transaction_id() == tx_id
         
         await store.rollback()
-        await store.close()
     
-    @pytest.mark.asyncio
-    async def test_async_commit_without_transaction_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_commit_without_transaction_raises_error(self, store):
         """Test that async commit() raises error without active transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         with pytest.raises(NoActiveTransactionError):
             await store.commit()
-        
-        await store.close()
     
-    @pytest.mark.asyncio
-    async def test_async_rollback_without_transaction_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_rollback_without_transaction_raises_error(self, store):
         """Test that async rollback() raises error without active transaction."""
-        store = AsyncStore()
-        await store.initialize()
-        
         with pytest.raises(NoActiveTransactionError):
             await store.rollback()
-        
-        await store.close()
 
 
 class TestAsyncStoreKeyValueOperations:
     """Test async key-value operations within transactions."""
     
-    @pytest.mark.asyncio
-    async def test_async_set_and_get_basic(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_set_and_get_basic(self, store):
         """Test basic async set and get operations."""
-        store = AsyncStore()
-        await store.initialize()
-        await store.begin()
-        
-        await store.set("key1", "value1")
-        assert await store.get("key1") == "value1"
-        
-        await store.set("key2", 42)
-        assert await store.get("key2") == 42
-        
-        await store.set("key3", {"nested": "dict"})
-        assert await store.get("key3") == {"nested": "dict"}
-        
-        await store.rollback()
-        await store.close()
+        async with _txn_store(store):
+            await store.set("key1", "value1")
+            assert await store.get("key1") == "value1"
+            
+            await store.set("key2", 42)
+            assert await store.get("key2") == 42
+            
+            await store.set("key3", {"nested": "dict"})
+            assert await store.get("key3") == {"nested": "dict"}
     
-    @pytest.mark.asyncio
-    async def test_async_get_nonexistent_key_raises_error(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_get_nonexistent_key_raises_error(self, store):
         """Test that getting a nonexistent key raises KeyNotFoundError."""
-        store = AsyncStore()
-        await store.initialize()
-        await store.begin()
-        
-        with pytest.raises(KeyNotFoundError):
-            await store.get("nonexistent")
-        
-        await store.rollback()
-        await store.close()
+        async with _txn_store(store):
+            with pytest.raises(KeyNotFoundError):
+                await store.get("nonexistent")
     
-    @pytest.mark.asyncio
-    async def test_async_delete_existing_key(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_set_many_and_get_many(self, store):
+        """Test bulk set and get operations."""
+        async with _txn_store(store):
+            await store.set_many({"key1": "value1", "key2": 42})
+            assert await store.get_many(["key2", "key1"]) == [42, "value1"]
+            
+            with pytest.raises(KeyNotFoundError):
+                await store.get_many(["key1", "nonexistent"])
+    
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_async_delete_existing_key(self, store):
         """Test deleting an existing key."""
-        store = AsyncStore()
-        await store.initialize()
-        await store.begin()
-        
-        await store.set("key", "value")
-        assert await store.get("key") == "value"
-        
-        await store.delete("key")
-        with pytest.raises(KeyNotFoundError):
-            await store.get("key")
-        
-        await store.rollback()
-        await store.close()
+        async with _txn_store(store):
+            await store.set("key", "value")
+            assert await store.get("key") == "value"
+            
+            await store.delete("key")
+            with pytest.raises(KeyNotFoundError):
+                await store.get("key")
 
 
 class TestAsyncStoreNestedTransactions:
@@ -239,39 +250,55 @@ class TestAsyncStoreNestedTransactions:
 class TestAsyncStorePersistence:
     """Test async store with persistence."""
     
+    @pytest.mark.sqlite
     @pytest.mark.asyncio
-    async def test_async_sqlite_persistence(self):
+    async def test_async_sqlite_persistence(self, tmp_path):
         """Test async SQLite persistence."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        db_path = str(tmp_path / "persistence.db")
+        
+        # First store instance
+        storage1 = AsyncSQLiteStorage(db_path, synchronous="NORMAL")
+        store1 = AsyncStore(storage1)
+        await store1.initialize()
+        
+        await store1.begin()
+        await store1.set("persistent_key", "persistent_value")
+        await store1.set("number_key", 123)
+        await store1.commit()
+        await store1.close()
+        
+        # Second store instance
+        storage2 = AsyncSQLiteStorage(db_path, synchronous="NORMAL")
+        store2 = AsyncStore(storage2)
+        await store2.initialize()
+        
+        await store2.begin()
+        assert await store2.get("persistent_key") == "persistent_value"
+        assert await store2.get("number_key") == 123
+        await store2.rollback()
+        await store2.close()
+    
+    @pytest.mark.sqlite
+    @pytest.mark.asyncio
+    async def test_async_sqlite_pragmas(self, tmp_path):
+        """Test that the SQLite connection is tuned on initialize()."""
+        storage = AsyncSQLiteStorage(str(tmp_path / "pragmas.db"), synchronous="NORMAL")
+        await storage.initialize()
         
         try:
-            # First store instance
-            storage1 = AsyncSQLiteStorage(db_path)
-            store1 = AsyncStore(storage1)
-            await store1.initialize()
-            
-            await store1.begin()
-            await store1.set("persistent_key", "persistent_value")
-            await store1.set("number_key", 123)
-            await store1.commit()
-            await store1.close()
-            
-            # Second store instance
-            storage2 = AsyncSQLiteStorage(db_path)
-            store2 = AsyncStore(storage2)
-            await store2.initialize()
-            
-            await store2.begin()
-            assert await store2.get("persistent_key") == "persistent_value"
-            assert await store2.get("number_key") == 123
-            await store2.rollback()
-            await store2.close()
-            
+            cursor = await storage.connection.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+            cursor = await storage.connection.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1  # NORMAL
+            cursor = await storage.connection.execute("PRAGMA busy_timeout")
+            assert (await cursor.fetchone())[0] == 5000
         finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+            await storage.close()
+    
+    def test_async_sqlite_invalid_synchronous_mode(self):
+        """Test that an unknown synchronous mode is rejected."""
+        with pytest.raises(ValueError):
+            AsyncSQLiteStorage("unused.db", synchronous="SOMETIMES")
     
     @pytest.mark.asyncio
     async def test_async_inmemory_storage(self):
@@ -299,14 +326,15 @@ class TestAsyncStoreConcurrency:
         """Test concurrent transactions on the same store."""
         store = AsyncStore()
         await store.initialize()
+        barrier = asyncio.Barrier(5)
         
         async def transaction_worker(worker_id: int, key_prefix: str):
             """Worker function for concurrent transactions."""
             await store.begin()
             await store.set(f"{key_prefix}_{worker_id}", f"value_{worker_id}")
             
-            # Simulate some work
-            await asyncio.sleep(0.01)
+            # Wait until every worker is mid-transaction
+            await barrier.wait()
             
             value = await store.get(f"{key_prefix}_{worker_id}")
             assert value == f"value_{worker_id}"
@@ -315,12 +343,13 @@ class TestAsyncStoreConcurrency:
             return f"worker_{worker_id}_completed"
         
         # Run multiple concurrent transactions
-        tasks = [
-            transaction_worker(i, "concurrent")
-            for i in range(5)
-        ]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(transaction_worker(i, "concurrent"))
+                for i in range(5)
+            ]
         
-        results = await asyncio.gather(*tasks)
+        results = [task.result() for task in tasks]
         
         # All workers should complete successfully
         assert len(results) == 5
@@ -329,8 +358,7 @@ class TestAsyncStoreConcurrency:
         
         # Verify all data was committed
         committed_data = await store._get_committed_data()
-        for i in range(5):
-            assert committed_data[f"concurrent_{i}"] == f"value_{i}"
+        assert committed_data == {f"concurrent_{i}": f"value_{i}" for i in range(5)}
         
         await store.close()
     
@@ -339,6 +367,7 @@ class TestAsyncStoreConcurrency:
         """Test concurrent nested transactions."""
         store = AsyncStore()
         await store.initialize()
+        barrier = asyncio.Barrier(4)
         
         async def nested_transaction_worker(worker_id: int):
             """Worker with nested transactions."""
@@ -350,8 +379,8 @@ class TestAsyncStoreConcurrency:
             await store.begin()
             await store.set(f"inner_{worker_id}", f"inner_value_{worker_id}")
             
-            # Simulate work
-            await asyncio.sleep(0.01)
+            # Wait until every worker is inside its inner transaction
+            await barrier.wait()
             
             # Commit inner, rollback outer (or vice versa)
             if worker_id % 2 == 0:
@@ -364,8 +393,9 @@ class TestAsyncStoreConcurrency:
             return worker_id
         
         # Run concurrent nested transactions
-        tasks = [nested_transaction_worker(i) for i in range(4)]
-        results = await asyncio.gather(*tasks)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(nested_transaction_worker(i)) for i in range(4)]
+        results = [task.result() for task in tasks]
         
         assert len(results) == 4
         
@@ -390,74 +420,63 @@ class TestAsyncStoreConcurrency:
         store = AsyncStore()
         await store.initialize()
         
-        async def batch_operations(batch_id: int, operations_per_batch: int = 100):
-            """Perform batch operations."""
-            await store.begin()
-            
-            # Set operations
-            for i in range(operations_per_batch):
-                await store.set(f"batch_{batch_id}_key_{i}", f"value_{i}")
-            
-            # Get operations
-            for i in range(operations_per_batch):
-                value = await store.get(f"batch_{batch_id}_key_{i}")
-                assert value == f"value_{i}"
-            
-            await store.commit()
-            return batch_id
-        
-        # Measure performance
-        start_time = time.time()
-        
         # Run 10 concurrent batches of 100 operations each
-        tasks = [batch_operations(i, 100) for i in range(10)]
-        results = await asyncio.gather(*tasks)
-        
-        end_time = time.time()
-        duration = end_time - start_time
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_batch_operations(store, i, 100)) for i in range(10)]
+        results = [task.result() for task in tasks]
         
         # All batches should complete
         assert len(results) == 10
         assert sorted(results) == list(range(10))
         
-        # Performance should be reasonable (1000 operations in reasonable time)
-        assert duration < 5.0, f"Operations took too long: {duration}s"
-        
         # Verify all data was committed
         committed_data = await store._get_committed_data()
-        assert len(committed_data) == 1000  # 10 batches * 100 operations
+        assert committed_data == {
+            f"batch_{b}_key_{i}": f"value_{i}" for b in range(10) for i in range(100)
+        }
         
         await store.close()
+    
+    @pytest.mark.benchmark
+    @pytest.mark.skipif(
+        not os.getenv("RUN_PERF") or importlib.util.find_spec("pytest_benchmark") is None,
+        reason="perf: set RUN_PERF=1 and install pytest-benchmark",
+    )
+    def test_benchmark_large_concurrent_operations(self, benchmark):
+        """Benchmark 10 concurrent batches of 100 set/get operations each."""
+        async def run():
+            store = AsyncStore()
+            await store.initialize()
+            await asyncio.gather(*(_batch_operations(store, i, 100) for i in range(10)))
+            await store.close()
+        
+        benchmark.pedantic(lambda: asyncio.run(run()), rounds=5, iterations=1)
+        
+        # 1000 sets + 1000 gets per round
+        benchmark.extra_info["ops_per_sec"] = 2000 / benchmark.stats.stats.mean
 
 
 class TestAsyncStoreContextManager:
     """Test async context manager functionality."""
     
+    @pytest.mark.sqlite
     @pytest.mark.asyncio
-    async def test_async_context_manager(self):
+    async def test_async_context_manager(self, tmp_path):
         """Test AsyncStore as async context manager."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        db_path = str(tmp_path / "context.db")
+        storage = AsyncSQLiteStorage(db_path, synchronous="NORMAL")
         
-        try:
-            storage = AsyncSQLiteStorage(db_path)
-            
-            async with AsyncStore(storage) as store:
-                await store.begin()
-                await store.set("context_key", "context_value")
-                await store.commit()
-            
-            # Verify data persisted and connection closed properly
-            new_storage = AsyncSQLiteStorage(db_path)
-            async with AsyncStore(new_storage) as new_store:
-                await new_store.begin()
-                assert await new_store.get("context_key") == "context_value"
-                await new_store.rollback()
-                
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        async with AsyncStore(storage) as store:
+            await store.begin()
+            await store.set("context_key", "context_value")
+            await store.commit()
+        
+        # Verify data persisted and connection closed properly
+        new_storage = AsyncSQLiteStorage(db_path, synchronous="NORMAL")
+        async with AsyncStore(new_storage) as new_store:
+            await new_store.begin()
+            assert await new_store.get("context_key") == "context_value"
+            await new_store.rollback()
 
 
 if __name__ == "__main__":
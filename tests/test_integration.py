@@ -3,90 +3,149 @@ Integration tests for the complete transactional key-value store system.
 """
 
 import pytest
-import sys
-import os
-import tempfile
 import json
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
 from kvstore import Store, SQLiteStorage, InMemoryStorage
 from kvstore.exceptions import KeyNotFoundError, NoActiveTransactionError
 
 
+# Various JSON data types that must survive a persistence round-trip
+_TEST_DATA = {
+    "string": "Hello, World!",
+    "integer": 42,
+    "float": 3.14159,
+    "boolean_true": True,
+    "boolean_false": False,
+    "none_value": None,
+    "list": [1, 2, "three", None, True],
+    "dict": {
+        "nested": {
+            "deep": "value",
+            "number": 123
+        },
+        "array": [1, 2, 3]
+    },
+    "unicode": "Hello 世界 🌍",
+    "empty_string": "",
+    "empty_list": [],
+    "empty_dict": {}
+}
+
+_DEFAULT_CONFIG = {
+    "database": {
+        "host": "localhost",
+        "port": 5432,
+        "name": "myapp"
+    },
+    "cache": {
+        "enabled": True,
+        "ttl": 3600
+    },
+    "features": {
+        "new_ui": False,
+        "analytics": True
+    }
+}
+
+_SESSION_DATA = {
+    "login_time": "2024-01-15T10:00:00Z",
+    "permissions": ["read", "write"],
+    "preferences": {"theme": "dark"}
+}
+
+# Values written by the interleaved transactions in the concurrency simulation
+_TX1_INITIAL = "tx1_initial"
+_TX1_FINAL = "tx1_final"
+_TX1_DATA = "tx1_data"
+_TX2_MODIFIED = "tx2_modified"
+_TX2_DATA = "tx2_data"
+
+
+@pytest.fixture
+def roundtrip(tmp_path):
+    """
+    A SQLite-backed store and a function that closes it and returns a
+    new store reopened on the same database file.
+    """
+    db_path = str(tmp_path / "test.db")
+    store = Store(SQLiteStorage(db_path))
+    stores = [store]
+    
+    def reopen():
+        store.close()
+        stores.append(Store(SQLiteStorage(db_path)))
+        return stores[-1]
+    
+    yield store, reopen
+    for opened in stores:
+        opened.close()
+
+
+def _seed(store, data):
+    """Commit initial data to the store in a single transaction."""
+    store.begin()
+    for key, value in data.items():
+        store.set(key, value)
+    store.commit()
+
+
 class TestEndToEndScenarios:
     """Test complete end-to-end scenarios."""
     
-    def test_complete_application_lifecycle(self):
+    @pytest.mark.sqlite
+    def test_complete_application_lifecycle(self, roundtrip):
         """Test a complete application lifecycle with persistence."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        # Application startup - initialize store
+        store, reopen = roundtrip
         
-        try:
-            # Application startup - initialize store
-            storage = SQLiteStorage(db_path)
-            store = Store(storage)
-            
-            # User session 1 - add initial data
-            store.begin()
-            store.set("user_count", 0)
-            store.set("app_config", {
-                "version": "1.0.0",
-                "features": ["transactions", "persistence"],
-                "debug": False
-            })
-            store.commit()
-            
-            # User session 2 - modify data
-            store.begin()
-            user_count = store.get("user_count")
-            store.set("user_count", user_count + 1)
-            
-            config = store.get("app_config")
-            config["debug"] = True
-            store.set("app_config", config)
-            
-            store.set("last_login", "2024-01-15T10:30:00Z")
-            store.commit()
-            
-            # Application shutdown
-            store.close()
-            
-            # Application restart - verify persistence
-            new_storage = SQLiteStorage(db_path)
-            new_store = Store(new_storage)
-            
-            new_store.begin()
-            assert new_store.get("user_count") == 1
-            
-            config = new_store.get("app_config")
-            assert config["version"] == "1.0.0"
-            assert config["debug"] is True
-            assert "transactions" in config["features"]
-            
-            assert new_store.get("last_login") == "2024-01-15T10:30:00Z"
-            
-            new_store.rollback()
-            new_store.close()
-            
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        # User session 1 - add initial data
+        store.begin()
+        store.set("user_count", 0)
+        store.set("app_config", {
+            "version": "1.0.0",
+            "features": ["transactions", "persistence"],
+            "debug": False
+        })
+        store.commit()
+        
+        # User session 2 - modify data
+        store.begin()
+        user_count = store.get("user_count")
+        store.set("user_count", user_count + 1)
+        
+        config = store.get("app_config")
+        config["debug"] = True
+        store.set("app_config", config)
+        
+        store.set("last_login", "2024-01-15T10:30:00Z")
+        store.commit()
+        
+        # Application shutdown and restart - verify persistence
+        new_store = reopen()
+        
+        new_store.begin()
+        assert new_store.get("user_count") == 1
+        
+        config = new_store.get("app_config")
+        assert config["version"] == "1.0.0"
+        assert config["debug"] is True
+        assert "transactions" in config["features"]
+        
+        assert new_store.get("last_login") == "2024-01-15T10:30:00Z"
+        
+        new_store.rollback()
+        new_store.close()
     
     def test_complex_nested_transaction_scenario(self):
         """Test complex nested transaction scenario."""
         store = Store()
         
+        # Initialize account balances
+        _seed(store, {"account_a": 1000, "account_b": 500, "account_c": 200})
+        
         # Simulate a complex business transaction
         store.begin()  # Main transaction
         
-        # Initialize account balances
-        store.set("account_a", 1000)
-        store.set("account_b", 500)
-        store.set("account_c", 200)
-        
         # Transfer 1: A -> B (100)
         store.begin()  # Transfer transaction 1
         balance_a = store.get("account_a")
@@ -134,10 +193,7 @@ class TestEndToEndScenarios:
         store = Store()
         
         # Setup initial state
-        store.begin()
-        store.set("counter", 0)
-        store.set("status", "initialized")
-        store.commit()
+        _seed(store, {"counter": 0, "status": "initialized"})
         
         # Scenario with errors
         store.begin()
@@ -176,60 +232,23 @@ class TestEndToEndScenarios:
         assert committed_data["counter"] == 1
         assert committed_data["status"] == "completed"
     
-    def test_data_type_preservation(self):
+    @pytest.mark.sqlite
+    def test_data_type_preservation(self, roundtrip):
         """Test that various data types are preserved correctly."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        store, reopen = roundtrip
         
-        try:
-            storage = SQLiteStorage(db_path)
-            store = Store(storage)
-            
-            # Test various data types
-            test_data = {
-                "string": "Hello, World!",
-                "integer": 42,
-                "float": 3.14159,
-                "boolean_true": True,
-                "boolean_false": False,
-                "none_value": None,
-                "list": [1, 2, "three", None, True],
-                "dict": {
-                    "nested": {
-                        "deep": "value",
-                        "number": 123
-                    },
-                    "array": [1, 2, 3]
-                },
-                "unicode": "Hello 世界 🌍",
-                "empty_string": "",
-                "empty_list": [],
-                "empty_dict": {}
-            }
-            
-            # Store all test data
-            store.begin()
-            for key, value in test_data.items():
-                store.set(key, value)
-            store.commit()
-            store.close()
-            
-            # Restart and verify data preservation
-            new_storage = SQLiteStorage(db_path)
-            new_store = Store(new_storage)
-            
-            new_store.begin()
-            for key, expected_value in test_data.items():
-                actual_value = new_store.get(key)
-                assert actual_value == expected_value, f"Data type not preserved for {key}: expected {expected_value}, got {actual_value}"
-            
-            new_store.rollback()
-            new_store.close()
-            
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        # Store all test data
+        store.begin()
+        for key, value in _TEST_DATA.items():
+            store.set(key, value)
+        store.commit()
+        
+        # Restart and verify data preservation
+        new_store = reopen()
+        
+        assert new_store._get_committed_data() == _TEST_DATA
+        
+        new_store.close()
     
     def test_concurrent_transaction_simulation(self):
         """Test simulation of concurrent transactions (single-threaded)."""
@@ -239,42 +258,43 @@ class TestEndToEndScenarios:
         
         # Transaction 1 starts
         tx1 = store.begin()
-        store.set("shared_resource", "tx1_initial")
+        store.set("shared_resource", _TX1_INITIAL)
         
         # Transaction 2 starts (nested)
         tx2 = store.begin()
-        store.set("shared_resource", "tx2_modified")
-        store.set("tx2_only", "tx2_data")
+        store.set("shared_resource", _TX2_MODIFIED)
+        store.set("tx2_only", _TX2_DATA)
         
         # Transaction 1 continues (but we're in tx2 context)
         # This simulates what would happen if tx1 tried to read
-        assert store.get("shared_resource") == "tx2_modified"  # Sees tx2's changes
+        assert store.get("shared_resource") == _TX2_MODIFIED  # Sees tx2's changes
         
         # Transaction 2 commits
         store.commit()  # tx2 commits
         
         # Now we're back in tx1 context
-        assert store.get("shared_resource") == "tx2_modified"  # tx1 sees tx2's committed changes
-        assert store.get("tx2_only") == "tx2_data"
+        assert store.get("shared_resource") == _TX2_MODIFIED  # tx1 sees tx2's committed changes
+        assert store.get("tx2_only") == _TX2_DATA
         
         # Transaction 1 makes final changes
-        store.set("shared_resource", "tx1_final")
-        store.set("tx1_only", "tx1_data")
+        store.set("shared_resource", _TX1_FINAL)
+        store.set("tx1_only", _TX1_DATA)
         
         # Transaction 1 commits
         store.commit()
         
         # Verify final state
         committed_data = store._get_committed_data()
-        assert committed_data["shared_resource"] == "tx1_final"
-        assert committed_data["tx1_only"] == "tx1_data"
-        assert committed_data["tx2_only"] == "tx2_data"
+        assert committed_data["shared_resource"] == _TX1_FINAL
+        assert committed_data["tx1_only"] == _TX1_DATA
+        assert committed_data["tx2_only"] == _TX2_DATA
 
 
 class TestStorageBackendIntegration:
     """Test integration between Store and storage backends."""
     
-    def test_storage_backend_switching(self):
+    @pytest.mark.sqlite
+    def test_storage_backend_switching(self, tmp_path):
         """Test switching between storage backends."""
         # Start with in-memory storage
         memory_storage = InMemoryStorage()
@@ -286,81 +306,61 @@ class TestStorageBackendIntegration:
         store1.close()
         
         # Switch to SQLite storage
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        db_path = str(tmp_path / "test.db")
         
-        try:
-            sqlite_storage = SQLiteStorage(db_path)
-            store2 = Store(sqlite_storage)
-            
-            store2.begin()
-            store2.set("sqlite_key", "sqlite_value")
-            store2.commit()
-            store2.close()
-            
-            # Verify each storage has its own data
-            memory_data = memory_storage.get_committed_data()
-            sqlite_data = sqlite_storage.get_committed_data()
-            
-            assert "memory_key" in memory_data
-            assert "memory_key" not in sqlite_data
-            assert "sqlite_key" in sqlite_data
-            assert "sqlite_key" not in memory_data
-            
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        sqlite_storage = SQLiteStorage(db_path)
+        store2 = Store(sqlite_storage)
+        
+        store2.begin()
+        store2.set("sqlite_key", "sqlite_value")
+        store2.commit()
+        store2.close()
+        
+        # Verify each storage has its own data
+        memory_data = memory_storage.get_committed_data()
+        sqlite_data = sqlite_storage.get_committed_data()
+        
+        assert "memory_key" in memory_data
+        assert "memory_key" not in sqlite_data
+        assert "sqlite_key" in sqlite_data
+        assert "sqlite_key" not in memory_data
     
-    def test_storage_backend_error_handling(self):
+    @pytest.mark.sqlite
+    def test_storage_backend_error_handling(self, tmp_path):
         """Test error handling in storage backends."""
-        # Test with invalid database path (should still work, creates file)
-        invalid_path = "/tmp/test_kvstore_integration.db"
+        # Test with a database file that doesn't exist yet (creates file)
+        db_path = str(tmp_path / "test_kvstore_integration.db")
         
-        try:
-            storage = SQLiteStorage(invalid_path)
-            store = Store(storage)
-            
-            # Should work despite "invalid" path
-            store.begin()
-            store.set("test_key", "test_value")
-            store.commit()
-            
-            # Verify data was stored
-            data = storage.get_committed_data()
-            assert data["test_key"] == "test_value"
-            
-            store.close()
-            
-        finally:
-            if os.path.exists(invalid_path):
-                os.unlink(invalid_path)
+        storage = SQLiteStorage(db_path)
+        store = Store(storage)
+        
+        # Should work despite the missing file
+        store.begin()
+        store.set("test_key", "test_value")
+        store.commit()
+        
+        # Verify data was stored
+        data = storage.get_committed_data()
+        assert data["test_key"] == "test_value"
+        
+        store.close()
     
-    def test_context_manager_integration(self):
+    @pytest.mark.sqlite
+    def test_context_manager_integration(self, roundtrip):
         """Test context manager integration with storage backends."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        # Test context manager with SQLite storage
+        store, reopen = roundtrip
         
-        try:
-            # Test context manager with SQLite storage
-            storage = SQLiteStorage(db_path)
-            
-            with Store(storage) as store:
-                store.begin()
-                store.set("context_key", "context_value")
-                store.commit()
-            
-            # Verify data was persisted and connection closed properly
-            new_storage = SQLiteStorage(db_path)
-            with Store(new_storage) as new_store:
-                new_store.begin()
-                assert new_store.get("context_key") == "context_value"
-                new_store.rollback()
-            
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        with store:
+            store.begin()
+            store.set("context_key", "context_value")
+            store.commit()
+        
+        # Verify data was persisted and connection closed properly
+        with reopen() as new_store:
+            new_store.begin()
+            assert new_store.get("context_key") == "context_value"
+            new_store.rollback()
 
 
 class TestRealWorldUseCases:
@@ -371,24 +371,9 @@ class TestRealWorldUseCases:
         store = Store()
         
         # Initialize default configuration
-        store.begin()
-        default_config = {
-            "database": {
-                "host": "localhost",
-                "port": 5432,
-                "name": "myapp"
-            },
-            "cache": {
-                "enabled": True,
-                "ttl": 3600
-            },
-            "features": {
-                "new_ui": False,
-                "analytics": True
-            }
-        }
-        store.set("config", default_config)
-        store.commit()
+        _seed(store, {
+            "config": {section: dict(values) for section, values in _DEFAULT_CONFIG.items()}
+        })
         
         # Update configuration
         store.begin()
@@ -418,11 +403,7 @@ class TestRealWorldUseCases:
         # User login
         store.begin()
         store.set("user_id", "user123")
-        store.set("session_data", {
-            "login_time": "2024-01-15T10:00:00Z",
-            "permissions": ["read", "write"],
-            "preferences": {"theme": "dark"}
-        })
+        store.set("session_data", _SESSION_DATA)
         store.set("is_authenticated", True)
         store.commit()
         
@@ -441,9 +422,8 @@ class TestRealWorldUseCases:
         session_data = store.get("session_data")
         old_theme = session_data["preferences"]["theme"]
         
-        # Create a deep copy to avoid mutation issues
-        import copy
-        new_session_data = copy.deepcopy(session_data)
+        # Copy the levels being modified to avoid mutation issues
+        new_session_data = {**session_data, "preferences": {**session_data["preferences"]}}
         new_session_data["preferences"]["theme"] = "light"
         store.set("session_data", new_session_data)
         
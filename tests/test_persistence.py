@@ -3,40 +3,37 @@ Tests for persistence layer functionality.
 """
 
 import pytest
-import os
-import tempfile
-import sys
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from kvstore import Store, SQLiteStorage, InMemoryStorage
 from kvstore.exceptions import KeyNotFoundError, NoActiveTransactionError
 
 
+@pytest.fixture
+def sqlite_storage(request, tmp_path):
+    """
+    SQLiteStorage on an in-memory database by default.
+    
+    Parametrize indirectly with "file" for tests that reopen the database.
+    Test databases are throwaway, so they trade power-loss durability for
+    fewer fsyncs with synchronous=NORMAL.
+    """
+    kind = getattr(request, "param", "memory")
+    db_path = str(tmp_path / "test.db") if kind == "file" else ":memory:"
+    storage = SQLiteStorage(db_path, synchronous="NORMAL")
+    yield storage
+    storage.close()
+
+
+@pytest.mark.sqlite
 class TestSQLiteStorage:
     """Test SQLite storage backend."""
     
-    def setup_method(self):
-        """Set up test with temporary database."""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_path = self.temp_db.name
-        self.storage = SQLiteStorage(self.db_path)
-    
-    def teardown_method(self):
-        """Clean up temporary database."""
-        if hasattr(self, 'storage'):
-            self.storage.close()
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
-    
-    def test_sqlite_initialization(self):
+    def test_sqlite_initialization(self, sqlite_storage):
         """Test SQLite storage initialization."""
-        self.storage.initialize()
+        sqlite_storage.initialize()
         
         # Check that tables were created
-        cursor = self.storage.connection.cursor()
+        cursor = sqlite_storage.connection.cursor()
         cursor.execute("""
             SELECT name FROM sqlite_master 
             WHERE type='table' AND name IN ('kv_data', 'transaction_log')
@@ -46,66 +43,93 @@ class TestSQLiteStorage:
         assert 'kv_data' in tables
         assert 'transaction_log' in tables
     
-    def test_sqlite_commit_and_retrieve(self):
+    @pytest.mark.parametrize("sqlite_storage", ["file"], indirect=True)
+    def test_sqlite_pragmas(self, sqlite_storage):
+        """Test that the SQLite connection is tuned on initialize()."""
+        sqlite_storage.initialize()
+        
+        connection = sqlite_storage.connection
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert connection.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+    
+    def test_sqlite_defaults_to_full_synchronous(self, tmp_path):
+        """Test that durability is only relaxed when asked for."""
+        storage = SQLiteStorage(str(tmp_path / "default.db"))
+        storage.initialize()
+        
+        try:
+            assert storage.connection.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+        finally:
+            storage.close()
+    
+    def test_sqlite_commit_and_retrieve(self, sqlite_storage):
         """Test committing and retrieving data from SQLite."""
-        self.storage.initialize()
+        sqlite_storage.initialize()
         
         # Commit some data
         changes = {"key1": "value1", "key2": 42, "key3": {"nested": "dict"}}
         deletions = set()
         
-        self.storage.commit_transaction(changes, deletions)
+        sqlite_storage.commit_transaction(changes, deletions)
         
         # Retrieve data
-        data = self.storage.get_committed_data()
+        data = sqlite_storage.get_committed_data()
         
         assert data["key1"] == "value1"
         assert data["key2"] == 42
         assert data["key3"] == {"nested": "dict"}
     
-    def test_sqlite_deletions(self):
+    def test_sqlite_deletions(self, sqlite_storage):
         """Test deletions in SQLite storage."""
-        self.storage.initialize()
+        sqlite_storage.initialize()
         
         # First commit some data
         changes = {"key1": "value1", "key2": "value2"}
-        self.storage.commit_transaction(changes, set())
+        sqlite_storage.commit_transaction(changes, set())
         
         # Then delete one key
         changes = {}
         deletions = {"key1"}
-        self.storage.commit_transaction(changes, deletions)
+        sqlite_storage.commit_transaction(changes, deletions)
         
         # Check results
-        data = self.storage.get_committed_data()
+        data = sqlite_storage.get_committed_data()
         assert "key1" not in data
         assert data["key2"] == "value2"
     
-    def test_sqlite_backup_restore(self):
+    @pytest.mark.parametrize("sqlite_storage", ["file"], indirect=True)
+    def test_sqlite_backup_restore(self, sqlite_storage, tmp_path):
         """Test backup and restore functionality."""
-        self.storage.initialize()
+        sqlite_storage.initialize()
         
         # Add some data
         changes = {"backup_key": "backup_value"}
-        self.storage.commit_transaction(changes, set())
+        sqlite_storage.commit_transaction(changes, set())
         
         # Create backup
-        backup_path = self.db_path + ".backup"
-        self.storage.backup_data(backup_path)
+        backup_path = str(tmp_path / "backup.db")
+        sqlite_storage.backup_data(backup_path)
         
         # Modify original data
         changes = {"backup_key": "modified_value"}
-        self.storage.commit_transaction(changes, set())
+        sqlite_storage.commit_transaction(changes, set())
         
         # Restore from backup
-        self.storage.restore_data(backup_path)
+        sqlite_storage.restore_data(backup_path)
         
         # Check restored data
-        data = self.storage.get_committed_data()
+        data = sqlite_storage.get_committed_data()
         assert data["backup_key"] == "backup_value"
-        
-        # Clean up backup
-        os.unlink(backup_path)
+
+
+class TestSQLiteStorageValidation:
+    """Test SQLiteStorage argument checks, which never open a database."""
+    
+    def test_sqlite_invalid_synchronous_mode(self):
+        """Test that an unknown synchronous mode is rejected."""
+        with pytest.raises(ValueError):
+            SQLiteStorage("unused.db", synchronous="SOMETIMES")
 
 
 class TestInMemoryStorage:
@@ -146,23 +170,19 @@ class TestInMemoryStorage:
         assert data["key2"] == "value2"
 
 
+@pytest.mark.sqlite
+@pytest.mark.parametrize("sqlite_storage", ["file"], indirect=True)
 class TestStoreWithSQLitePersistence:
     """Test Store class with SQLite persistence."""
     
-    def setup_method(self):
-        """Set up test with temporary database."""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_path = self.temp_db.name
-        self.storage = SQLiteStorage(self.db_path)
+    @pytest.fixture(autouse=True)
+    def _store(self, sqlite_storage):
+        """Set up a store on a database file the tests reopen."""
+        self.db_path = sqlite_storage.db_path
+        self.storage = sqlite_storage
         self.store = Store(self.storage)
-    
-    def teardown_method(self):
-        """Clean up temporary database."""
-        if hasattr(self, 'store'):
-            self.store.close()
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+        yield
+        self.store.close()
     
     def test_persistent_basic_operations(self):
         """Test basic operations with persistence."""
@@ -174,7 +194,7 @@ class TestStoreWithSQLitePersistence:
         
         # Create new store instance with same database
         self.store.close()
-        new_storage = SQLiteStorage(self.db_path)
+        new_storage = SQLiteStorage(self.db_path, synchronous="NORMAL")
         new_store = Store(new_storage)
         
         # Data should be persisted
@@ -199,7 +219,7 @@ class TestStoreWithSQLitePersistence:
         
         # Create new store instance
         self.store.close()
-        new_storage = SQLiteStorage(self.db_path)
+        new_storage = SQLiteStorage(self.db_path, synchronous="NORMAL")
         new_store = Store(new_storage)
         
         # Check persistence
@@ -225,7 +245,7 @@ class TestStoreWithSQLitePersistence:
         
         # Create new store instance
         self.store.close()
-        new_storage = SQLiteStorage(self.db_path)
+        new_storage = SQLiteStorage(self.db_path, synchronous="NORMAL")
         new_store = Store(new_storage)
         
         # Check persisted value
@@ -235,6 +255,23 @@ class TestStoreWithSQLitePersistence:
         
         new_store.close()
     
+    def test_clear_removes_persisted_data(self):
+        """Test that _clear() deletes committed data from the database."""
+        self.store.begin()
+        self.store.set("cleared_key", "cleared_value")
+        self.store.commit()
+        
+        self.store._clear()
+        
+        # Create new store instance
+        self.store.close()
+        new_storage = SQLiteStorage(self.db_path, synchronous="NORMAL")
+        new_store = Store(new_storage)
+        
+        assert new_store._get_committed_data() == {}
+        
+        new_store.close()
+    
     def test_rollback_no_persistence(self):
         """Test that rolled back transactions don't persist."""
         # Set data but rollback
@@ -244,7 +281,7 @@ class TestStoreWithSQLitePersistence:
         
         # Create new store instance
         self.store.close()
-        new_storage = SQLiteStorage(self.db_path)
+        new_storage = SQLiteStorage(self.db_path, synchronous="NORMAL")
         new_store = Store(new_storage)
         
         # Data should not be persisted
@@ -276,86 +313,78 @@ class TestStoreWithInMemoryStorage:
         store.close()
 
 
+@pytest.mark.sqlite
 class TestStorageComparison:
     """Test that both storage backends behave identically."""
     
-    def setup_method(self):
-        """Set up both storage types."""
-        # SQLite storage
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_path = self.temp_db.name
-        self.sqlite_storage = SQLiteStorage(self.db_path)
-        self.sqlite_store = Store(self.sqlite_storage)
-        
-        # In-memory storage
-        self.memory_storage = InMemoryStorage()
-        self.memory_store = Store(self.memory_storage)
+    @pytest.fixture(scope="class")
+    def stores(self):
+        """One store per storage type, shared by the tests of this class."""
+        sqlite_store = Store(SQLiteStorage(":memory:"))
+        memory_store = Store(InMemoryStorage())
+        yield sqlite_store, memory_store
+        sqlite_store.close()
+        memory_store.close()
     
-    def teardown_method(self):
-        """Clean up resources."""
-        if hasattr(self, 'sqlite_store'):
-            self.sqlite_store.close()
-        if hasattr(self, 'memory_store'):
-            self.memory_store.close()
-        if os.path.exists(self.db_path):
-            os.unlink(self.db_path)
+    @pytest.fixture(autouse=True)
+    def _stores(self, stores):
+        """Hand each test the shared stores, emptied after it runs."""
+        self.sqlite_store, self.memory_store = stores
+        yield
+        for store in stores:
+            store._clear()
+    
+    TEST_OPERATIONS = [
+        ("begin", []),
+        ("set", ["key1", "value1"]),
+        ("set", ["key2", 42]),
+        ("commit", []),
+        ("begin", []),
+        ("set", ["key3", {"nested": "data"}]),
+        ("delete", ["key1"]),
+        ("commit", []),
+    ]
     
     def test_identical_behavior(self):
         """Test that both storage backends produce identical results."""
-        test_operations = [
-            ("begin", []),
-            ("set", ["key1", "value1"]),
-            ("set", ["key2", 42]),
-            ("commit", []),
-            ("begin", []),
-            ("set", ["key3", {"nested": "data"}]),
-            ("delete", ["key1"]),
-            ("commit", []),
-        ]
-        
-        # Apply same operations to both stores
-        for operation, args in test_operations:
+        # Apply same operations to both stores, comparing after every step
+        for step, (operation, args) in enumerate(self.TEST_OPERATIONS):
             getattr(self.sqlite_store, operation)(*args)
             getattr(self.memory_store, operation)(*args)
+            
+            sqlite_data = self.sqlite_store._get_committed_data()
+            memory_data = self.memory_store._get_committed_data()
+            if sqlite_data != memory_data:
+                pytest.fail(
+                    f"Backends diverged at step {step} {operation}{tuple(args)}: "
+                    f"{sqlite_data} != {memory_data}"
+                )
         
         # Compare final state
-        sqlite_data = self.sqlite_store._get_committed_data()
-        memory_data = self.memory_store._get_committed_data()
-        
-        assert sqlite_data == memory_data
-        assert "key1" not in sqlite_data  # Should be deleted
-        assert sqlite_data["key2"] == 42
-        assert sqlite_data["key3"] == {"nested": "data"}
+        assert sqlite_data == {"key2": 42, "key3": {"nested": "data"}}
 
 
+@pytest.mark.sqlite
 class TestContextManager:
     """Test context manager functionality."""
     
-    def test_store_context_manager(self):
+    def test_store_context_manager(self, tmp_path):
         """Test Store as context manager."""
-        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        temp_db.close()
-        db_path = temp_db.name
+        db_path = str(tmp_path / "test.db")
         
-        try:
-            storage = SQLiteStorage(db_path)
-            
-            with Store(storage) as store:
-                store.begin()
-                store.set("context_key", "context_value")
-                store.commit()
-            
-            # Verify data persisted and connection closed properly
-            new_storage = SQLiteStorage(db_path)
-            with Store(new_storage) as new_store:
-                new_store.begin()
-                assert new_store.get("context_key") == "context_value"
-                new_store.rollback()
-                
-        finally:
-            if os.path.exists(db_path):
-                os.unlink(db_path)
+        storage = SQLiteStorage(db_path)
+        
+        with Store(storage) as store:
+            store.begin()
+            store.set("context_key", "context_value")
+            store.commit()
+        
+        # Verify data persisted and connection closed properly
+        new_storage = SQLiteStorage(db_path)
+        with Store(new_storage) as new_store:
+            new_store.begin()
+            assert new_store.get("context_key") == "context_value"
+            new_store.rollback()
 
 
 if __name__ == "__main__":
@@ -3,13 +3,26 @@ Test the specific example from requirements (a=50, nested a=60).
 """
 
 import pytest
-import sys
-import os
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from kvstore import Store
+from kvstore.exceptions import KeyNotFoundError, NoActiveTransactionError
+
+
+# Value of "a" at each nesting level of the requirements example
+_PRIMED_VALUES = (50, 60)
+
+
+@pytest.fixture
+def primed_store():
+    """
+    A store left in the state the requirements example ends in:
+    store.begin(); store.set("a", 50); store.begin(); store.set("a", 60)
+    """
+    store = Store()
+    for value in _PRIMED_VALUES:
+        store.begin()
+        store.set("a", value)
+    return store
 
 
 class TestRequirementsExample:
@@ -60,28 +73,21 @@ class TestRequirementsExample:
         committed_data = store._get_committed_data()
         assert committed_data["a"] == 50
     
-    def test_requirements_example_with_inner_commit(self):
-        """Test the example with inner transaction commit instead of rollback."""
-        store = Store()
+    @pytest.mark.parametrize("final_op,expected", [("rollback", 50), ("commit", 60)])
+    def test_requirements_example_inner_outcome(self, primed_store, final_op, expected):
+        """Test ending the requirements example's inner transaction either way."""
+        # End the inner transaction
+        getattr(primed_store, final_op)()
         
-        # Same setup as requirements
-        store.begin()
-        store.set("a", 50)
-        store.begin()
-        store.set("a", 60)
-        
-        # But commit inner transaction instead of rollback
-        store.commit()  # Commit inner transaction
-        
-        # Outer transaction should now see the inner value
-        assert store.get("a") == 60
+        # Outer transaction sees the outer value or the committed inner value
+        assert primed_store.get("a") == expected
         
         # Commit outer transaction
-        store.commit()
+        primed_store.commit()
         
-        # Final state should have inner value
-        committed_data = store._get_committed_data()
-        assert committed_data["a"] == 60
+        # Final state should match what the outer transaction saw
+        committed_data = primed_store._get_committed_data()
+        assert committed_data["a"] == expected
     
     def test_requirements_example_multiple_keys(self):
         """Test the example pattern with multiple keys."""
@@ -99,22 +105,17 @@ class TestRequirementsExample:
         store.set("d", "inner_only")  # Add new
         # Leave "b" and "c" unchanged
         
-        # Verify inner transaction state
-        assert store.get("a") == 60
-        assert store.get("b") == "outer"  # Inherited from outer
-        assert store.get("c") == [1, 2, 3]  # Inherited from outer
-        assert store.get("d") == "inner_only"
+        # Verify inner transaction state ("b" and "c" inherited from outer)
+        assert store.snapshot() == {"a": 60, "b": "outer", "c": [1, 2, 3], "d": "inner_only"}
         
         # Rollback inner transaction
         store.rollback()
         
-        # Verify outer transaction state
-        assert store.get("a") == 50  # Back to outer value
-        assert store.get("b") == "outer"
-        assert store.get("c") == [1, 2, 3]
+        # Verify outer transaction state: "a" back to outer value and
+        # inner-only key "d" gone
+        assert store.snapshot() == {"a": 50, "b": "outer", "c": [1, 2, 3]}
         
-        # Inner-only key should not exist
-        with pytest.raises(Exception):  # KeyNotFoundError
+        with pytest.raises(KeyNotFoundError):
             store.get("d")
         
         # Commit outer transaction
@@ -147,7 +148,7 @@ class TestRequirementsExample:
         
         # Verify inner state
         assert store.get("a") == 60
-        with pytest.raises(Exception):  # KeyNotFoundError
+        with pytest.raises(KeyNotFoundError):
             store.get("to_delete")
         
         # Rollback inner transaction
@@ -159,55 +160,49 @@ class TestRequirementsExample:
         
         store.commit()
     
-    def test_requirements_example_deep_nesting(self):
+    def test_requirements_example_deep_nesting(self, primed_store):
         """Test the example pattern with deeper nesting."""
-        store = Store()
-        
-        # Level 1
-        store.begin()
-        store.set("a", 50)
+        # Value of "a" at each level nested below the requirements example;
+        # extend this list to test deeper nesting
+        deeper_values = [70]
+        values = [*_PRIMED_VALUES, *deeper_values]
+        store = primed_store
         
-        # Level 2 (like requirements example)
-        store.begin()
-        store.set("a", 60)
-        
-        # Level 3 (additional nesting)
-        store.begin()
-        store.set("a", 70)
+        # Additional nesting
+        for value in deeper_values:
+            store.begin()
+            store.set("a", value)
         
         # Verify deepest level
-        assert store.get("a") == 70
-        
-        # Rollback level 3
-        store.rollback()
-        assert store.get("a") == 60  # Back to level 2
+        assert store.get("a") == values[-1]
         
-        # Rollback level 2
-        store.rollback()
-        assert store.get("a") == 50  # Back to level 1
+        # Rollback down to level 1, checking each level on the way
+        for expected in reversed(values[:-1]):
+            store.rollback()
+            assert store.get("a") == expected
         
         # Commit level 1
         store.commit()
         
         # Verify final state
         committed_data = store._get_committed_data()
-        assert committed_data["a"] == 50
+        assert committed_data["a"] == values[0]
     
     def test_requirements_example_error_conditions(self):
         """Test error conditions in the requirements example scenario."""
         store = Store()
         
         # Test operations without transaction
-        with pytest.raises(Exception):  # NoActiveTransactionError
+        with pytest.raises(NoActiveTransactionError):
             store.set("a", 50)
         
-        with pytest.raises(Exception):  # NoActiveTransactionError
+        with pytest.raises(NoActiveTransactionError):
             store.get("a")
         
-        with pytest.raises(Exception):  # NoActiveTransactionError
+        with pytest.raises(NoActiveTransactionError):
             store.commit()
         
-        with pytest.raises(Exception):  # NoActiveTransactionError
+        with pytest.raises(NoActiveTransactionError):
             store.rollback()
         
         # Start proper sequence
@@ -215,11 +210,11 @@ class TestRequirementsExample:
         store.set("a", 50)
         
         # Test getting nonexistent key
-        with pytest.raises(Exception):  # KeyNotFoundError
+        with pytest.raises(KeyNotFoundError):
             store.get("nonexistent")
         
         # Test deleting nonexistent key
-        with pytest.raises(Exception):  # KeyNotFoundError
+        with pytest.raises(KeyNotFoundError):
             store.delete("nonexistent")
         
         # Transaction should still be valid after errors
@@ -5,12 +5,13 @@ import json
 import os
 import sys
 import tempfile
-from django.test import TestCase, Client
+from importlib import import_module
+from django.test import TestCase, Client, RequestFactory
 from django.urls import reverse
 from django.conf import settings
 
 # Configure Django settings for testing
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kvstore_api.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kvstore_api.test_settings')
 
 import django
 from django.test.utils import setup_test_environment, teardown_test_environment
@@ -23,22 +24,99 @@ if not settings.configured:
 setup_test_environment()
 
 
+# Request bodies, encoded once at import
+
+# A value mixing every JSON type
+_COMPLEX_VALUE = {
+    'nested': {'deep': 'value'},
+    'list': [1, 2, 3],
+    'number': 42,
+    'boolean': True,
+    'null': None
+}
+_SET_COMPLEX = json.dumps({'key': 'complex_key', 'value': _COMPLEX_VALUE}).encode()
+
+# A set request made after the transaction was rolled back
+_SET_NO_TX = json.dumps({'key': 'no_tx', 'value': 'no_tx_value'}).encode()
+
+# Set, get and delete keys in one batch
+_BATCH_SUCCESS = json.dumps({
+    'operations': [
+        {'type': 'set', 'key': 'batch1', 'value': 'value1'},
+        {'type': 'set', 'key': 'batch2', 'value': 'value2'},
+        {'type': 'get', 'key': 'batch1'},
+        {'type': 'delete', 'key': 'batch2'},
+    ]
+}).encode()
+
+# Commit and roll back transactions inside a batch
+_BATCH_TRANSACTIONS = json.dumps({
+    'operations': [
+        {'type': 'begin'},
+        {'type': 'set', 'key': 'batch1', 'value': 'value1'},
+        {'type': 'commit'},
+        {'type': 'begin'},
+        {'type': 'delete', 'key': 'batch1'},
+        {'type': 'rollback'},
+        {'type': 'get', 'key': 'batch1'},
+    ]
+}).encode()
+
+# A batch where the second and third operations fail
+_BATCH_WITH_ERRORS = json.dumps({
+    'operations': [
+        {'type': 'set', 'key': 'batch1', 'value': 'value1'},
+        {'type': 'get', 'key': 'nonexistent'},  # This will fail
+        {'type': 'invalid', 'key': 'batch2'},   # Invalid operation
+        {'type': 'get', 'key': 'batch1'},       # This will succeed
+    ]
+}).encode()
+
+# The requirements example (a=50, nested a=60) as a single batch
+_BATCH_REQUIREMENTS_EXAMPLE = json.dumps({
+    'operations': [
+        {'type': 'begin'},                          # Begin outer transaction
+        {'type': 'set', 'key': 'a', 'value': 50},
+        {'type': 'begin'},                          # Begin inner transaction
+        {'type': 'set', 'key': 'a', 'value': 60},
+        {'type': 'get', 'key': 'a'},                # Should be 60
+        {'type': 'rollback'},                       # Rollback inner transaction
+        {'type': 'get', 'key': 'a'},                # Should be 50
+        {'type': 'commit'},                         # Commit outer transaction
+    ]
+}).encode()
+
+# A set request without its 'value' field
+_SET_MISSING_VALUE = json.dumps({'key': 'test_key'}).encode()
+
+# A batch without operations
+_BATCH_EMPTY = json.dumps({'operations': []}).encode()
+
+
 class RestAPITestCase(TestCase):
     """Base test case for REST API tests."""
     
-    def setUp(self):
-        """Set up test client and session."""
-        self.client = Client()
-        # Create session
-        session = self.client.session
-        session.create()
-        session.save()
+    @classmethod
+    def setUpClass(cls):
+        """Set up a client with an initialized store shared by the class."""
+        super().setUpClass()
+        cls.shared_client = Client()
+        response = cls.shared_client.post('/api/store/init/')
+        cls.session_id = response.json()['session_id']
     
-    def tearDown(self):
-        """Clean up after tests."""
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after the class's tests."""
         # Clean up any store instances
         from api.store_manager import store_manager
         store_manager.close_all_stores()
+        super().tearDownClass()
+    
+    def setUp(self):
+        """Reuse the shared client, starting from an empty store."""
+        from api.store_manager import store_manager
+        self.client = self.shared_client
+        store_manager.get_store(self.session_id)._clear()
 
 
 class TestStoreManagement(RestAPITestCase):
@@ -69,11 +147,6 @@ class TestStoreManagement(RestAPITestCase):
 class TestTransactionManagement(RestAPITestCase):
     """Test transaction management endpoints."""
     
-    def setUp(self):
-        super().setUp()
-        # Initialize store
-        self.client.post('/api/store/init/')
-    
     def test_begin_transaction(self):
         """Test beginning a transaction."""
         response = self.client.post('/api/store/begin/')
@@ -153,103 +226,63 @@ class TestTransactionManagement(RestAPITestCase):
 class TestKeyValueOperations(RestAPITestCase):
     """Test key-value operations."""
     
+    # (method, path, payload, expected status, expected response fields),
+    # applied in order within one transaction
+    # (method, path, body, expected status, expected fields, has 'message')
+    KEY_VALUE_CASES = [
+        ('put', '/api/store/set/', json.dumps({'key': 'test_key', 'value': 'test_value'}).encode(),
+         200, {'key': 'test_key', 'value': 'test_value'}, True),
+        ('get', '/api/store/get/test_key/', None,
+         200, {'key': 'test_key', 'value': 'test_value'}, False),
+        ('get', '/api/store/get/nonexistent/', None,
+         404, {'error': 'KeyNotFoundError'}, True),
+        ('delete', '/api/store/delete/test_key/', None,
+         200, {'key': 'test_key'}, True),
+        ('get', '/api/store/get/test_key/', None,
+         404, {'error': 'KeyNotFoundError'}, True),
+        ('delete', '/api/store/delete/nonexistent/', None,
+         404, {'error': 'KeyNotFoundError'}, True),
+    ]
+    
     def setUp(self):
         super().setUp()
-        # Initialize store and begin transaction
-        self.client.post('/api/store/init/')
+        # Begin transaction
         self.client.post('/api/store/begin/')
     
-    def test_set_key(self):
-        """Test setting a key-value pair."""
-        data = {
-            'key': 'test_key',
-            'value': 'test_value'
-        }
-        
-        response = self.client.put('/api/store/set/', 
-                                 data=json.dumps(data),
-                                 content_type='application/json')
-        
-        self.assertEqual(response.status_code, 200)
-        response_data = response.json()
-        self.assertEqual(response_data['key'], 'test_key')
-        self.assertEqual(response_data['value'], 'test_value')
-        self.assertIn('message', response_data)
+    def test_set_get_delete(self):
+        """Test setting, getting and deleting keys, including missing keys."""
+        for method, path, payload, expected_status, expected, has_message in self.KEY_VALUE_CASES:
+            with self.subTest(method=method, path=path):
+                if payload is None:
+                    response = getattr(self.client, method)(path)
+                else:
+                    response = getattr(self.client, method)(path,
+                                                            data=payload,
+                                                            content_type='application/json')
+                
+                self.assertEqual(response.status_code, expected_status)
+                data = response.json()
+                for field, value in expected.items():
+                    self.assertEqual(data[field], value)
+                if has_message:
+                    self.assertIn('message', data)
+                else:
+                    self.assertNotIn('message', data)
     
     def test_set_complex_value(self):
         """Test setting complex data types."""
-        data = {
-            'key': 'complex_key',
-            'value': {
-                'nested': {'deep': 'value'},
-                'list': [1, 2, 3],
-                'number': 42,
-                'boolean': True,
-                'null': None
-            }
-        }
-        
-        response = self.client.put('/api/store/set/',
-                                 data=json.dumps(data),
-                                 content_type='application/json')
+        # Call the view directly, skipping URL resolution and middleware
+        from api.views import SetKeyView
+        SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+        request = RequestFactory().put('/api/store/set/',
+                                       data=_SET_COMPLEX,
+                                       content_type='application/json')
+        request.session = SessionStore(session_key=self.session_id)
+        response = SetKeyView.as_view()(request)
         
         self.assertEqual(response.status_code, 200)
-        response_data = response.json()
-        self.assertEqual(response_data['key'], 'complex_key')
-        self.assertEqual(response_data['value'], data['value'])
-    
-    def test_get_key(self):
-        """Test getting a value by key."""
-        # Set a key first
-        set_data = {'key': 'get_test', 'value': 'get_value'}
-        self.client.put('/api/store/set/',
-                       data=json.dumps(set_data),
-                       content_type='application/json')
-        
-        # Get the key
-        response = self.client.get('/api/store/get/get_test/')
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertEqual(data['key'], 'get_test')
-        self.assertEqual(data['value'], 'get_value')
-    
-    def test_get_nonexistent_key(self):
-        """Test getting a nonexistent key."""
-        response = self.client.get('/api/store/get/nonexistent/')
-        
-        self.assertEqual(response.status_code, 404)
-        data = response.json()
-        self.assertEqual(data['error'], 'KeyNotFoundError')
-        self.assertIn('message', data)
-    
-    def test_delete_key(self):
-        """Test deleting a key."""
-        # Set a key first
-        set_data = {'key': 'delete_test', 'value': 'delete_value'}
-        self.client.put('/api/store/set/',
-                       data=json.dumps(set_data),
-                       content_type='application/json')
-        
-        # Delete the key
-        response = self.client.delete('/api/store/delete/delete_test/')
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertEqual(data['key'], 'delete_test')
-        self.assertIn('message', data)
-        
-        # Verify key is deleted
-        get_response = self.client.get('/api/store/get/delete_test/')
-        self.assertEqual(get_response.status_code, 404)
-    
-    def test_delete_nonexistent_key(self):
-        """Test deleting a nonexistent key."""
-        response = self.client.delete('/api/store/delete/nonexistent/')
-        
-        self.assertEqual(response.status_code, 404)
-        data = response.json()
-        self.assertEqual(data['error'], 'KeyNotFoundError')
+        self.assertEqual(response.data['key'], 'complex_key')
+        self.assertEqual(response.data['value'], _COMPLEX_VALUE)
     
     def test_operations_without_transaction(self):
         """Test operations without active transaction."""
@@ -257,9 +290,8 @@ class TestKeyValueOperations(RestAPITestCase):
         self.client.post('/api/store/rollback/')
         
         # Try to set key without transaction
-        set_data = {'key': 'no_tx', 'value': 'no_tx_value'}
         response = self.client.put('/api/store/set/',
-                                 data=json.dumps(set_data),
+                                 data=_SET_NO_TX,
                                  content_type='application/json')
         
         self.assertEqual(response.status_code, 400)
@@ -272,23 +304,13 @@ class TestBatchOperations(RestAPITestCase):
     
     def setUp(self):
         super().setUp()
-        # Initialize store and begin transaction
-        self.client.post('/api/store/init/')
+        # Begin transaction
         self.client.post('/api/store/begin/')
     
     def test_batch_operations_success(self):
         """Test successful batch operations."""
-        data = {
-            'operations': [
-                {'type': 'set', 'key': 'batch1', 'value': 'value1'},
-                {'type': 'set', 'key': 'batch2', 'value': 'value2'},
-                {'type': 'get', 'key': 'batch1'},
-                {'type': 'delete', 'key': 'batch2'},
-            ]
-        }
-        
         response = self.client.post('/api/store/batch/',
-                                  data=json.dumps(data),
+                                  data=_BATCH_SUCCESS,
                                   content_type='application/json')
         
         self.assertEqual(response.status_code, 200)
@@ -306,19 +328,28 @@ class TestBatchOperations(RestAPITestCase):
         self.assertEqual(results[2]['value'], 'value1')
         self.assertEqual(results[3]['status'], 'success')
     
+    def test_batch_transaction_operations(self):
+        """Test begin, commit and rollback inside a batch."""
+        response = self.client.post('/api/store/batch/',
+                                  data=_BATCH_TRANSACTIONS,
+                                  content_type='application/json')
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = response.json()
+        
+        self.assertEqual(response_data['success_count'], 7)
+        self.assertEqual(response_data['error_count'], 0)
+        
+        results = response_data['results']
+        self.assertIn('transaction_id', results[0])
+        self.assertEqual(results[2]['type'], 'commit')
+        self.assertEqual(results[5]['type'], 'rollback')
+        self.assertEqual(results[6]['value'], 'value1')
+    
     def test_batch_operations_with_errors(self):
         """Test batch operations with some errors."""
-        data = {
-            'operations': [
-                {'type': 'set', 'key': 'batch1', 'value': 'value1'},
-                {'type': 'get', 'key': 'nonexistent'},  # This will fail
-                {'type': 'invalid', 'key': 'batch2'},   # Invalid operation
-                {'type': 'get', 'key': 'batch1'},       # This will succeed
-            ]
-        }
-        
         response = self.client.post('/api/store/batch/',
-                                  data=json.dumps(data),
+                                  data=_BATCH_WITH_ERRORS,
                                   content_type='application/json')
         
         self.assertEqual(response.status_code, 200)
@@ -339,69 +370,30 @@ class TestBatchOperations(RestAPITestCase):
 class TestNestedTransactions(RestAPITestCase):
     """Test nested transactions via REST API."""
     
-    def setUp(self):
-        super().setUp()
-        # Initialize store
-        self.client.post('/api/store/init/')
-    
     def test_requirements_example_via_api(self):
         """Test the requirements example via REST API."""
-        # Begin outer transaction
-        response1 = self.client.post('/api/store/begin/')
-        self.assertEqual(response1.status_code, 201)
-        tx1_id = response1.json()['transaction_id']
-        
-        # Set a = 50
-        set_data = {'key': 'a', 'value': 50}
-        response2 = self.client.put('/api/store/set/',
-                                  data=json.dumps(set_data),
-                                  content_type='application/json')
-        self.assertEqual(response2.status_code, 200)
-        
-        # Begin inner transaction
-        response3 = self.client.post('/api/store/begin/')
-        self.assertEqual(response3.status_code, 201)
-        tx2_id = response3.json()['transaction_id']
-        self.assertNotEqual(tx1_id, tx2_id)
-        
-        # Set a = 60
-        set_data = {'key': 'a', 'value': 60}
-        response4 = self.client.put('/api/store/set/',
-                                  data=json.dumps(set_data),
+        response = self.client.post('/api/store/batch/',
+                                  data=_BATCH_REQUIREMENTS_EXAMPLE,
                                   content_type='application/json')
-        self.assertEqual(response4.status_code, 200)
-        
-        # Get a (should be 60)
-        response5 = self.client.get('/api/store/get/a/')
-        self.assertEqual(response5.status_code, 200)
-        self.assertEqual(response5.json()['value'], 60)
-        
-        # Rollback inner transaction
-        response6 = self.client.post('/api/store/rollback/')
-        self.assertEqual(response6.status_code, 200)
         
-        # Get a (should be 50)
-        response7 = self.client.get('/api/store/get/a/')
-        self.assertEqual(response7.status_code, 200)
-        self.assertEqual(response7.json()['value'], 50)
+        self.assertEqual(response.status_code, 200)
+        response_data = response.json()
+        self.assertEqual(response_data['error_count'], 0)
         
-        # Commit outer transaction
-        response8 = self.client.post('/api/store/commit/')
-        self.assertEqual(response8.status_code, 200)
+        results = response_data['results']
+        self.assertNotEqual(results[0]['transaction_id'], results[2]['transaction_id'])
+        self.assertEqual(results[4]['value'], 60)
+        self.assertEqual(results[6]['value'], 50)
         
         # Check transaction status
-        response9 = self.client.get('/api/store/transaction/status/')
-        self.assertEqual(response9.status_code, 200)
-        self.assertFalse(response9.json()['has_active_transaction'])
+        response = self.client.get('/api/store/transaction/status/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['has_active_transaction'])
 
 
 class TestErrorHandling(RestAPITestCase):
     """Test error handling in REST API."""
     
-    def setUp(self):
-        super().setUp()
-        self.client.post('/api/store/init/')
-    
     def test_invalid_json(self):
         """Test handling of invalid JSON."""
         response = self.client.put('/api/store/set/',
@@ -413,18 +405,16 @@ class TestErrorHandling(RestAPITestCase):
     def test_missing_required_fields(self):
         """Test handling of missing required fields."""
         # Missing 'value' field
-        data = {'key': 'test_key'}
         response = self.client.put('/api/store/set/',
-                                 data=json.dumps(data),
+                                 data=_SET_MISSING_VALUE,
                                  content_type='application/json')
         
         self.assertEqual(response.status_code, 400)
     
     def test_empty_batch_operations(self):
         """Test handling of empty batch operations."""
-        data = {'operations': []}
         response = self.client.post('/api/store/batch/',
-                                  data=json.dumps(data),
+                                  data=_BATCH_EMPTY,
                                   content_type='application/json')
         
         self.assertEqual(response.status_code, 400)
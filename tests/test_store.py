@@ -1,13 +1,12 @@
 """
 Comprehensive tests for the Store class.
+
+PYTEST_DONT_REWRITE: these are many small, stable equality checks, so the
+module skips pytest's assertion rewriting. Drop the marker temporarily to
+get detailed assertion messages while debugging a failure.
 """
 
 import pytest
-import sys
-import os
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from kvstore import Store
 from kvstore.exceptions import (
@@ -16,42 +15,88 @@ from kvstore.exceptions import (
     TransactionError,
 )
 
+_NESTED_VALUE = {"nested": "dict"}
+
+
+def _expect(exc, fn, *args, **kwargs):
+    """Assert that fn(*args, **kwargs) raises exc, without pytest.raises."""
+    try:
+        fn(*args, **kwargs)
+    except exc:
+        return
+    raise AssertionError(f"expected {exc.__name__}")
+
+
+@pytest.fixture
+def store():
+    """A fresh store with no committed data."""
+    return Store()
+
+
+@pytest.fixture
+def seeded_store(store):
+    """A store with key1 and key2 already committed."""
+    store.begin()
+    store.set("key1", "value1")
+    store.set("key2", "value2")
+    store.commit()
+    return store
+
 
 class TestStoreBasicOperations:
     """Test basic store operations."""
     
-    def test_store_initialization(self):
+    def test_store_initialization(self, store):
         """Test store can be initialized."""
-        store = Store()
         assert store is not None
         assert not store.has_active_transaction()
         assert store.get_current_transaction_id() is None
     
-    def test_set_without_transaction_raises_error(self):
-        """Test that set() raises error without active transaction."""
-        store = Store()
+    @pytest.mark.parametrize("method, args", [
+        ("set", ("key", "value")),
+        ("get", ("key",)),
+        ("delete", ("key",)),
+        ("commit", ()),
+        ("rollback", ()),
+        ("commit_all", ()),
+        ("rollback_all", ()),
+    ])
+    def test_operation_without_transaction_raises_error(self, store, method, args):
+        """Test that operations raise an error without an active transaction."""
         with pytest.raises(NoActiveTransactionError):
-            store.set("key", "value")
-    
-    def test_get_without_transaction_raises_error(self):
-        """Test that get() raises error without active transaction."""
-        store = Store()
-        with pytest.raises(NoActiveTransactionError):
-            store.get("key")
-    
-    def test_delete_without_transaction_raises_error(self):
-        """Test that delete() raises error without active transaction."""
-        store = Store()
-        with pytest.raises(NoActiveTransactionError):
-            store.delete("key")
+            getattr(store, method)(*args)
 
 
 class TestStoreTransactionLifecycle:
     """Test transaction lifecycle operations."""
     
-    def test_begin_transaction(self):
+    def test_clear_discards_transactions_and_data(self, seeded_store):
+        """Test that _clear() resets the store for reuse."""
+        store = seeded_store
+        store.begin()
+        store.set("key3", "value3")
+        store.begin()
+        
+        store._clear()
+        
+        assert not store.has_active_transaction()
+        assert store.snapshot() == {}
+    
+    def test_clear_keeps_earlier_snapshots(self, seeded_store):
+        """Test that _clear() does not empty a snapshot taken before it."""
+        store = seeded_store
+        snapshot = store.snapshot()
+        
+        store._clear()
+        store.begin()
+        store.set("key3", "value3")
+        store.commit()
+        
+        assert snapshot == {"key1": "value1", "key2": "value2"}
+        assert store.snapshot() == {"key3": "value3"}
+    
+    def test_begin_transaction(self, store):
         """Test beginning a transaction."""
-        store = Store()
         tx_id = store.begin()
         
         assert tx_id is not None
@@ -59,25 +104,18 @@ class TestStoreTransactionLifecycle:
         assert store.has_active_transaction()
         assert store.get_current_transaction_id() == tx_id
     
-    def test_commit_without_transaction_raises_error(self):
-        """Test that commit() raises error without active transaction."""
-        store = Store()
-        with pytest.raises(NoActiveTransactionError):
-            store.commit()
-    
-    def test_rollback_without_transaction_raises_error(self):
-        """Test that rollback() raises error without active transaction."""
-        store = Store()
-        with pytest.raises(NoActiveTransactionError):
-            store.rollback()
+    def test_transaction_ids_are_unique_across_stores(self, store):
+        """Test that separate stores never hand out the same transaction ID."""
+        other = Store()
+        
+        assert store.begin() != other.begin()
 
 
 class TestStoreKeyValueOperations:
     """Test key-value operations within transactions."""
     
-    def test_set_and_get_basic(self):
+    def test_set_and_get_basic(self, store):
         """Test basic set and get operations."""
-        store = Store()
         store.begin()
         
         store.set("key1", "value1")
@@ -86,40 +124,83 @@ class TestStoreKeyValueOperations:
         store.set("key2", 42)
         assert store.get("key2") == 42
         
-        store.set("key3", {"nested": "dict"})
-        assert store.get("key3") == {"nested": "dict"}
+        store.set("key3", _NESTED_VALUE)
+        assert store.get("key3") == _NESTED_VALUE
     
-    def test_get_nonexistent_key_raises_error(self):
+    def test_get_nonexistent_key_raises_error(self, store):
         """Test that getting a nonexistent key raises KeyNotFoundError."""
-        store = Store()
         store.begin()
         
         with pytest.raises(KeyNotFoundError):
             store.get("nonexistent")
     
-    def test_delete_existing_key(self):
+    def test_delete_existing_key(self, store):
         """Test deleting an existing key."""
-        store = Store()
         store.begin()
         
         store.set("key", "value")
         assert store.get("key") == "value"
         
         store.delete("key")
-        with pytest.raises(KeyNotFoundError):
-            store.get("key")
+        _expect(KeyNotFoundError, store.get, "key")
     
-    def test_delete_nonexistent_key_raises_error(self):
+    def test_delete_nonexistent_key_raises_error(self, store):
         """Test that deleting a nonexistent key raises KeyNotFoundError."""
-        store = Store()
         store.begin()
         
         with pytest.raises(KeyNotFoundError):
             store.delete("nonexistent")
     
-    def test_overwrite_existing_key(self):
+    def test_contains_many(self, store):
+        """Test checking several keys at once."""
+        store.begin()
+        store.set("key1", "value1")
+        store.commit()
+        
+        store.begin()
+        store.set("key2", "value2")
+        store.delete("key1")
+        
+        assert store.contains_many(["key1", "key2", "nonexistent"]) == [False, True, False]
+    
+    def test_snapshot(self, store):
+        """Test reading every visible key at once."""
+        store.begin()
+        store.set("key1", "value1")
+        store.set("key2", "value2")
+        store.commit()
+        
+        store.begin()
+        store.delete("key1")
+        store.begin()
+        store.set("key1", "inner")
+        store.set("key3", "value3")
+        
+        assert store.snapshot() == {"key1": "inner", "key2": "value2", "key3": "value3"}
+        
+        store.rollback()
+        assert store.snapshot() == {"key2": "value2"}
+        
+        store.rollback()
+        assert store.snapshot() == {"key1": "value1", "key2": "value2"}
+    
+    def test_snapshot_is_unaffected_by_later_commits(self, seeded_store):
+        """Test that a snapshot keeps the state it was taken in."""
+        store = seeded_store
+        snapshot = store.snapshot()
+        
+        store.begin()
+        store.delete("key1")
+        store.set("key3", "value3")
+        store.commit()
+        
+        assert snapshot == {"key1": "value1", "key2": "value2"}
+        assert store.snapshot() == {"key2": "value2", "key3": "value3"}
+        with pytest.raises(TypeError):
+            snapshot["key1"] = "changed"
+    
+    def test_overwrite_existing_key(self, store):
         """Test overwriting an existing key."""
-        store = Store()
         store.begin()
         
         store.set("key", "value1")
@@ -132,9 +213,8 @@ class TestStoreKeyValueOperations:
 class TestStoreTransactionCommit:
     """Test transaction commit behavior."""
     
-    def test_commit_single_transaction(self):
+    def test_commit_single_transaction(self, store):
         """Test committing a single transaction."""
-        store = Store()
         store.begin()
         
         store.set("key1", "value1")
@@ -146,36 +226,72 @@ class TestStoreTransactionCommit:
         assert not store.has_active_transaction()
         
         # Data should be committed
-        committed_data = store._get_committed_data()
-        assert committed_data["key1"] == "value1"
-        assert committed_data["key2"] == "value2"
+        assert store._get_committed_data() == {"key1": "value1", "key2": "value2"}
     
-    def test_commit_with_deletions(self):
+    def test_commit_with_deletions(self, seeded_store):
         """Test committing a transaction with deletions."""
-        store = Store()
+        store = seeded_store
+        store.begin()
+        store.delete("key1")
+        store.commit()
         
-        # First, commit some data
+        assert store._get_committed_data() == {"key2": "value2"}
+    
+    def test_commit_with_deletions_in_same_transaction(self, store):
+        """Test committing a transaction that sets and then deletes a key."""
         store.begin()
         store.set("key1", "value1")
         store.set("key2", "value2")
+        store.delete("key1")
         store.commit()
         
-        # Then delete in a new transaction
+        assert store._get_committed_data() == {"key2": "value2"}
+    
+    def test_committed_reads_ignore_active_transaction(self, seeded_store):
+        """Test that committed_contains()/committed_get() see only committed data."""
+        store = seeded_store
         store.begin()
+        store.set("key3", "value3")
         store.delete("key1")
+        
+        assert store.committed_contains("key1")
+        assert not store.committed_contains("key3")
+        assert store.committed_get("key1") == "value1"
+        with pytest.raises(KeyNotFoundError):
+            store.committed_get("key3")
+        
         store.commit()
         
-        committed_data = store._get_committed_data()
-        assert "key1" not in committed_data
-        assert committed_data["key2"] == "value2"
+        assert not store.committed_contains("key1")
+        assert store.committed_get("key3") == "value3"
+    
+    def test_committed_data_is_read_only(self, seeded_store):
+        """Test that the committed data view cannot be modified."""
+        committed_data = seeded_store._get_committed_data()
+        with pytest.raises(TypeError):
+            committed_data["key1"] = "changed"
+        
+        assert committed_data == {"key1": "value1", "key2": "value2"}
+    
+    def test_committed_data_is_a_snapshot(self, seeded_store):
+        """Test that committed data views never follow later commits."""
+        store = seeded_store
+        store.snapshot()
+        before_commit = store._get_committed_data()
+        
+        store.begin()
+        store.set("key3", "value3")
+        store.commit()
+        
+        assert before_commit == {"key1": "value1", "key2": "value2"}
+        assert store._get_committed_data() == {"key1": "value1", "key2": "value2", "key3": "value3"}
 
 
 class TestStoreTransactionRollback:
     """Test transaction rollback behavior."""
     
-    def test_rollback_single_transaction(self):
+    def test_rollback_single_transaction(self, store):
         """Test rolling back a single transaction."""
-        store = Store()
         store.begin()
         
         store.set("key1", "value1")
@@ -190,34 +306,23 @@ class TestStoreTransactionRollback:
         committed_data = store._get_committed_data()
         assert len(committed_data) == 0
     
-    def test_rollback_preserves_previous_data(self):
+    def test_rollback_preserves_previous_data(self, seeded_store):
         """Test that rollback preserves previously committed data."""
-        store = Store()
-        
-        # First, commit some data
-        store.begin()
-        store.set("key1", "value1")
-        store.commit()
-        
-        # Then make changes and rollback
+        store = seeded_store
         store.begin()
         store.set("key1", "new_value")
-        store.set("key2", "value2")
+        store.set("key3", "value3")
         store.rollback()
         
         # Original data should be preserved
-        committed_data = store._get_committed_data()
-        assert committed_data["key1"] == "value1"
-        assert "key2" not in committed_data
+        assert store._get_committed_data() == {"key1": "value1", "key2": "value2"}
 
 
 class TestStoreNestedTransactions:
     """Test nested transaction behavior."""
     
-    def test_nested_transaction_basic(self):
+    def test_nested_transaction_basic(self, store):
         """Test basic nested transaction functionality."""
-        store = Store()
-        
         # Outer transaction
         tx1_id = store.begin()
         store.set("key1", "outer_value")
@@ -234,10 +339,8 @@ class TestStoreNestedTransactions:
         assert store.get("key1") == "outer_value"
         assert store.get("key2") == "inner_value"
     
-    def test_nested_transaction_commit_propagation(self):
+    def test_nested_transaction_commit_propagation(self, store):
         """Test that nested transaction commits propagate to parent."""
-        store = Store()
-        
         store.begin()
         store.set("key1", "outer_value")
         
@@ -255,14 +358,10 @@ class TestStoreNestedTransactions:
         store.commit()  # Commit outer transaction
         
         # Now data should be committed to store
-        committed_data = store._get_committed_data()
-        assert committed_data["key1"] == "outer_value"
-        assert committed_data["key2"] == "inner_value"
+        assert store._get_committed_data() == {"key1": "outer_value", "key2": "inner_value"}
     
-    def test_nested_transaction_rollback_isolation(self):
+    def test_nested_transaction_rollback_isolation(self, store):
         """Test that nested transaction rollback doesn't affect parent."""
-        store = Store()
-        
         store.begin()
         store.set("key1", "outer_value")
         
@@ -277,20 +376,68 @@ class TestStoreNestedTransactions:
         assert store.get("key1") == "outer_value"
         
         # Inner value should not be visible
-        with pytest.raises(KeyNotFoundError):
-            store.get("key2")
+        _expect(KeyNotFoundError, store.get, "key2")
         
         store.commit()  # Commit outer transaction
         
-        committed_data = store._get_committed_data()
-        assert committed_data["key1"] == "outer_value"
-        assert "key2" not in committed_data
+        assert store._get_committed_data() == {"key1": "outer_value"}
+    
+    def test_nested_commit_merges_deletions_into_parent(self, seeded_store):
+        """Test that an inner commit carries its deletions and re-sets to the parent."""
+        store = seeded_store
+        store.begin()
+        store.set("key3", "outer_value")
+        store.delete("key2")
+        
+        store.begin()
+        store.delete("key3")
+        store.set("key2", "inner_value")
+        store.commit()
+        
+        assert store.snapshot() == {"key1": "value1", "key2": "inner_value"}
+        
+        store.commit()
+        assert store._get_committed_data() == {"key1": "value1", "key2": "inner_value"}
+    
+    def test_commit_all_commits_every_level(self, store):
+        """Test that commit_all() matches committing each level in turn."""
+        store.begin()
+        store.set("key1", "outer_value")
+        store.set("key2", "outer_value")
+        
+        store.begin()
+        store.set("key2", "inner_value")
+        store.delete("key1")
+        
+        store.begin()
+        store.set("key3", "innermost_value")
+        
+        store.commit_all()
+        
+        assert not store.has_active_transaction()
+        assert store._get_committed_data() == {"key2": "inner_value", "key3": "innermost_value"}
+    
+    def test_rollback_all_discards_every_level(self, store):
+        """Test that rollback_all() discards all active transactions."""
+        store.begin()
+        store.set("key1", "value1")
+        store.commit()
+        
+        store.begin()
+        store.set("key1", "outer_value")
+        store.begin()
+        store.set("key2", "inner_value")
+        
+        store.rollback_all()
+        
+        assert not store.has_active_transaction()
+        assert store._get_committed_data() == {"key1": "value1"}
 
 
 class TestStoreRequirementExample:
     """Test the specific example from the requirements."""
     
-    def test_requirement_example_scenario(self):
+    def test_requirement_example_scenario(self, store):
         """
         Test the exact scenario from requirements:
         store.begin()
@@ -298,8 +445,6 @@ class TestStoreRequirementExample:
         store.begin()
         store.set("a", 60)
         """
-        store = Store()
-        
         # Outer transaction
         store.begin()
         store.set("a", 50)
@@ -324,13 +469,10 @@ class TestStoreRequirementExample:
         store.commit()
         
         # Value should be committed
-        committed_data = store._get_committed_data()
-        assert committed_data["a"] == 50
+        assert store._get_committed_data() == {"a": 50}
     
-    def test_requirement_example_with_inner_commit(self):
+    def test_requirement_example_with_inner_commit(self, store):
         """Test the example scenario with inner transaction commit."""
-        store = Store()
-        
         store.begin()
         store.set("a", 50)
         
@@ -344,87 +486,71 @@ class TestStoreRequirementExample:
         store.commit()  # Commit outer transaction
         
         # Final committed value should be 60
-        committed_data = store._get_committed_data()
-        assert committed_data["a"] == 60
+        assert store._get_committed_data() == {"a": 60}
 
 
 class TestStoreEdgeCases:
     """Test edge cases and error conditions."""
     
-    def test_multiple_nested_transactions(self):
+    def test_multiple_nested_transactions(self, store):
         """Test multiple levels of nested transactions."""
-        store = Store()
-        
-        store.begin()  # Level 1
-        store.set("key", "level1")
-        
-        store.begin()  # Level 2
-        store.set("key", "level2")
-        
-        store.begin()  # Level 3
-        store.set("key", "level3")
-        
-        assert store.get("key") == "level3"
-        
-        store.rollback()  # Rollback level 3
-        assert store.get("key") == "level2"
-        
-        store.commit()  # Commit level 2
-        assert store.get("key") == "level2"
-        
-        store.commit()  # Commit level 1
-        
-        committed_data = store._get_committed_data()
-        assert committed_data["key"] == "level2"
+        ops = [
+            ("begin",), ("set", "key", "level1"),  # Level 1
+            ("begin",), ("set", "key", "level2"),  # Level 2
+            ("begin",), ("set", "key", "level3"),  # Level 3
+            ("get", "key"),
+            ("rollback",), ("get", "key"),  # Rollback level 3
+            ("commit",), ("get", "key"),  # Commit level 2
+            ("commit",),  # Commit level 1
+        ]
+        results = store.exec_ops(ops)
+        
+        reads = [result for op, result in zip(ops, results) if op[0] == "get"]
+        assert reads == ["level3", "level2", "level2"]
+        
+        assert store._get_committed_data() == {"key": "level2"}
     
-    def test_delete_and_recreate_in_transaction(self):
+    def test_delete_and_recreate_in_transaction(self, seeded_store):
         """Test deleting and recreating a key in the same transaction."""
-        store = Store()
-        
-        # First commit some data
-        store.begin()
-        store.set("key", "original")
-        store.commit()
-        
-        # Delete and recreate in new transaction
-        store.begin()
-        store.delete("key")
+        store = seeded_store
+        store.exec_ops([("begin",), ("delete", "key1")])
         
         # Key should not be accessible after deletion
-        with pytest.raises(KeyNotFoundError):
-            store.get("key")
+        _expect(KeyNotFoundError, store.get, "key1")
         
         # Recreate the key
-        store.set("key", "new_value")
-        assert store.get("key") == "new_value"
+        results = store.exec_ops([("set", "key1", "new_value"), ("get", "key1"), ("commit",)])
+        assert results[1] == "new_value"
         
-        store.commit()
+        assert store._get_committed_data() == {"key1": "new_value", "key2": "value2"}
+    
+    def test_exec_ops_rejects_unknown_operation(self, store):
+        """Test that exec_ops() stops at an unsupported operation."""
+        with pytest.raises(ValueError):
+            store.exec_ops([("begin",), ("set", "key", "value"), ("close",)])
         
-        committed_data = store._get_committed_data()
-        assert committed_data["key"] == "new_value"
+        assert store.get("key") == "value"
     
-    def test_empty_string_and_none_values(self):
-        """Test storing empty strings and None values."""
-        store = Store()
+    @pytest.mark.parametrize("key, value", [
+        ("empty_string", ""),
+        ("none_value", None),
+        ("zero", 0),
+        ("false", False),
+    ])
+    def test_empty_string_and_none_values(self, store, key, value):
+        """Test storing empty strings, None and other falsy values."""
         store.begin()
+        store.set(key, value)
         
-        store.set("empty_string", "")
-        store.set("none_value", None)
-        store.set("zero", 0)
-        store.set("false", False)
-        
-        assert store.get("empty_string") == ""
-        assert store.get("none_value") is None
-        assert store.get("zero") == 0
-        assert store.get("false") is False
+        # Compare types as well, since 0 == False
+        result = store.get(key)
+        assert result == value and type(result) is type(value)
         
         store.commit()
         
-        committed_data = store._get_committed_data()
-        assert committed_data["empty_string"] == ""
-        assert committed_data["none_value"] is None
-        assert committed_data["zero"] == 0
-        assert committed_data["false"] is False
+        assert store.committed_contains(key)
+        committed = store.committed_get(key)
+        assert committed == value and type(committed) is type(value)
 
 
 if __name__ == "__main__":